@@ -3,76 +3,148 @@
 from __future__ import annotations
 
 import asyncio
+import time
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from .manager import IntesisManager
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+from .manager import (
+    DEFAULT_HOST_CONNECT_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_CONNECTS,
+    ConnectLimiter,
+    IntesisManager,
+    create_controller,
+)
+from .snapshot import DeviceSnapshotStore
 DOMAIN = "intesisaccloud"
-PLATFORMS = ["climate", "switch"]
+PLATFORMS = ["climate", "sensor", "switch"]
+
+# Seconds a controller connected by the config flow may be adopted by setup
+FLOW_CONTROLLER_TTL = 300
+
+CONF_MAX_CONCURRENT_CONNECTS = "max_concurrent_connects"
+CONF_HOST_CONNECT_INTERVAL = "host_connect_interval"
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_CONNECTS, default=DEFAULT_MAX_CONCURRENT_CONNECTS
+                ): cv.positive_int,
+                vol.Optional(
+                    CONF_HOST_CONNECT_INTERVAL, default=DEFAULT_HOST_CONNECT_INTERVAL
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
 
 import logging
 _LOGGER = logging.getLogger(__name__)
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the login budget shared by all config entries and the services."""
+    from .services import async_setup_services
+
+    conf = config.get(DOMAIN, {})
+    hass.data.setdefault(DOMAIN, {})["connect_limiter"] = ConnectLimiter(
+        conf.get(CONF_MAX_CONCURRENT_CONNECTS, DEFAULT_MAX_CONCURRENT_CONNECTS),
+        conf.get(CONF_HOST_CONNECT_INTERVAL, DEFAULT_HOST_CONNECT_INTERVAL),
+    )
+    async_setup_services(hass, DOMAIN)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up IntesisHome from a config entry."""
-    from homeassistant.const import CONF_DEVICE, CONF_HOST, CONF_PASSWORD, CONF_USERNAME
-    from homeassistant.helpers.aiohttp_client import async_get_clientsession
+    start = time.monotonic()
+    from homeassistant.const import CONF_DEVICE
     from homeassistant.exceptions import ConfigEntryNotReady
 
-    from pyintesishome import (
-        IHAuthenticationError,
-        IHConnectionError,
-        IntesisBox,
-        IntesisHome,
-        IntesisHomeLocal,
-    )
+    from pyintesishome import IHAuthenticationError, IHConnectionError
     from pyintesishome.const import (
-        DEVICE_INTESISBOX,
-        DEVICE_INTESISHOME_LOCAL,
         DEVICE_INTESISHOME,
         DEVICE_ANYWAIR,
         DEVICE_AIRCONWITHME,
     )
 
+    import_time = time.monotonic() - start
+
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN].setdefault("controller", {})
+    connect_limiter = hass.data[DOMAIN].setdefault(
+        "connect_limiter",
+        ConnectLimiter(DEFAULT_MAX_CONCURRENT_CONNECTS, DEFAULT_HOST_CONNECT_INTERVAL),
+    )
 
     device_type = entry.data.get(CONF_DEVICE)
     _LOGGER.debug("Initializing controller for device type: %s", device_type)
-    
-    if device_type == DEVICE_INTESISBOX:
-        controller = IntesisBox(entry.data[CONF_HOST], loop=hass.loop)
-    elif device_type == DEVICE_INTESISHOME_LOCAL:
-        controller = IntesisHomeLocal(
-            entry.data[CONF_HOST],
-            entry.data[CONF_USERNAME],
-            entry.data[CONF_PASSWORD],
-            loop=hass.loop,
-            websession=async_get_clientsession(hass),
-        )
+
+    adopted = await _async_adopt_flow_controller(hass, entry)
+
+    if adopted:
+        _LOGGER.debug("Adopting the controller connected by the config flow")
+        controller = adopted
     else:
-        controller = IntesisHome(
-            entry.data[CONF_USERNAME],
-            entry.data[CONF_PASSWORD],
-            loop=hass.loop,
-            device_type=device_type,
-            websession=async_get_clientsession(hass),
+        controller = create_controller(hass, entry.data)
+
+    manager = IntesisManager(
+        hass, controller, entry, device_type, connect_limiter, DeviceSnapshotStore(hass, entry.entry_id)
+    )
+    manager.startup_timings["import"] = import_time
+    if adopted is None and await manager.async_restore():
+        # Entities start from the last run's state, so startup does not wait for the API
+        entry.async_create_background_task(
+            hass, manager.async_connect_in_background(), f"intesisaccloud connect {entry.title}"
         )
+    else:
+        try:
+            await manager.async_connect(already_connected=adopted is not None)
+        except (IHAuthenticationError, IHConnectionError) as ex:
+            _LOGGER.error("Connection failed: %s", ex)
+            raise ConfigEntryNotReady from ex
+
+    hass.data[DOMAIN]["controller"][entry.entry_id] = manager
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    _LOGGER.debug("Forwarding entry setups for %s", ", ".join(PLATFORMS))
+    start = time.monotonic()
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    manager.startup_timings["platform_forward"] = time.monotonic() - start
+
+    _LOGGER.debug(
+        "Setup of %s finished: %s",
+        entry.title,
+        ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in manager.startup_timings.items()),
+    )
+
+    return True
 
-    manager = IntesisManager(hass, controller, entry, device_type)
-    try:
-        await manager.async_connect()
-    except (IHAuthenticationError, IHConnectionError) as ex:
-        _LOGGER.error("Connection failed: %s", ex)
-        raise ConfigEntryNotReady from ex
 
-    hass.data[DOMAIN]["controller"][entry.unique_id] = manager
+async def _async_adopt_flow_controller(hass: HomeAssistant, entry: ConfigEntry):
+    """Return the controller the config flow connected for this entry, if still fresh."""
+    handover = hass.data[DOMAIN].get("flow_controllers", {}).pop(entry.unique_id, None)
+    if handover is None:
+        return None
 
-    _LOGGER.debug("Forwarding entry setups for climate and switch")
-    await hass.config_entries.async_forward_entry_setups(entry, ["climate", "switch"])
+    controller = handover["controller"]
+    if time.monotonic() - handover["created"] < FLOW_CONTROLLER_TTL and controller.get_devices():
+        return controller
+
+    _LOGGER.debug("Controller from the config flow expired, connecting again")
+    await controller.stop()
+    return None
 
-    return True
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -80,7 +152,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        manager = hass.data[DOMAIN]["controller"].pop(entry.unique_id)
+        manager = hass.data[DOMAIN]["controller"].pop(entry.entry_id)
         if manager:
             await manager.stop()
             _LOGGER.debug("Controller stopped")
@@ -88,3 +160,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the snapshot of a deleted config entry."""
+    await DeviceSnapshotStore(hass, entry.entry_id).async_remove()
+
+
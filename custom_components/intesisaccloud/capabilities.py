@@ -0,0 +1,73 @@
+"""What each device supports, discovered once and shared by every entity of the device."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from functools import cache
+from typing import Any
+
+# Device keys that change what a device supports, the profile is rebuilt when they do
+PROFILE_KEYS = frozenset({"model", "number_of_zones"})
+
+# Zone statuses that mean the zone is open. Spill zones are opened by the unit
+# itself, they have no switch and are not counted as on.
+ZONE_ON_STATES = (1, "on")
+ZONE_SPILL_STATES = (7, "spill")
+ZONE_STATUS_PREFIX = "zone_status_"
+
+
+@cache
+def zone_keys(zone_index: int) -> tuple[str, str]:
+    """Return the device key holding a zone's status and the command key that sets it."""
+    return f"{ZONE_STATUS_PREFIX}{zone_index}", f"zone_{zone_index}"
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceCapabilities:
+    """Immutable capability profile of a device.
+
+    Profiles are hashable, so anything derived from them can be cached and
+    shared between devices of the same model.
+    """
+
+    model: str | None = None
+    setpoint_control: bool = False
+    vertical_swing: bool = False
+    horizontal_swing: bool = False
+    preset_mode: bool = False
+    fan_speeds: tuple[str, ...] = ()
+    modes: tuple[str, ...] = ()
+    zones: int = 0
+
+    @classmethod
+    def from_controller(cls, controller, device_id: str) -> DeviceCapabilities:
+        """Ask the controller what a device supports."""
+        device = controller.get_device(device_id) or {}
+        return cls(
+            model=device.get("model"),
+            setpoint_control=bool(controller.has_setpoint_control(device_id)),
+            vertical_swing=bool(controller.has_vertical_swing(device_id)),
+            horizontal_swing=bool(controller.has_horizontal_swing(device_id)),
+            preset_mode=bool(device.get("climate_working_mode")),
+            fan_speeds=tuple(controller.get_fan_speed_list(device_id) or ()),
+            modes=tuple(controller.get_mode_list(device_id) or ()),
+            zones=device.get("number_of_zones", 0),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DeviceCapabilities:
+        """Return the profile stored by as_dict, ignoring fields it does not know."""
+        known = {field.name for field in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        for key in ("fan_speeds", "modes"):
+            if key in values:
+                values[key] = tuple(values[key])
+        return cls(**values)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile as JSON serialisable values."""
+        return asdict(self)
+
+    def matches(self, device: dict[str, Any]) -> bool:
+        """Return if the profile still describes a device, i.e. its model and zones are unchanged."""
+        return device.get("model") == self.model and device.get("number_of_zones", 0) == self.zones
@@ -2,8 +2,9 @@
 """Support for IntesisACCloud and airconwithme Smart AC Controllers."""
 from __future__ import annotations
 
+from functools import cache
 import logging
-from random import randrange
+from typing import NamedTuple
 
 from homeassistant import config_entries, core
 from homeassistant.components.climate import (
@@ -29,25 +30,22 @@ from homeassistant.const import (
 from homeassistant.exceptions import PlatformNotReady
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 from pyintesishome import (
     IHAuthenticationError,
-    IHConnectionError,
     IntesisBase,
     IntesisBox,
     IntesisHome,
     IntesisHomeLocal,
 )
 from pyintesishome.const import (
-    DEVICE_AIRCONWITHME,
-    DEVICE_ANYWAIR,
     DEVICE_INTESISBOX,
-    DEVICE_INTESISHOME,
     DEVICE_INTESISHOME_LOCAL,
 )
 
 from . import DOMAIN
+from .capabilities import DeviceCapabilities
+from .entity import IntesisEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -67,6 +65,7 @@ MAP_IH_TO_PRESET_MODE = {
     "powerful": PRESET_BOOST,
 }
 MAP_PRESET_MODE_TO_IH = {v: k for k, v in MAP_IH_TO_PRESET_MODE.items()}
+PRESET_MODES = (PRESET_ECO, PRESET_COMFORT, PRESET_BOOST)
 
 IH_SWING_STOP = "auto/stop"
 IH_SWING_SWING = "swing"
@@ -79,6 +78,9 @@ MAP_HORIZONTAL_SWING_TO_IH = {
     SWING_OFF: IH_SWING_STOP,
     SWING_HORIZONTAL: IH_SWING_SWING,
 }
+SWING_MODES_OFF = (SWING_OFF,)
+SWING_MODES_VERTICAL = (SWING_OFF, SWING_VERTICAL)
+SWING_MODES_HORIZONTAL = (SWING_OFF, SWING_HORIZONTAL)
 
 MAP_STATE_ICONS = {
     HVACMode.COOL: "mdi:snowflake",
@@ -88,8 +90,78 @@ MAP_STATE_ICONS = {
     HVACMode.HEAT_COOL: "mdi:cached",
 }
 
-MAX_RETRIES = 10
-MAX_WAIT_TIME = 300
+# ClimateState slot, the controller getter that produces it, the device
+# dictionary keys it is derived from and an optional value mapping
+STATE_FIELDS = (
+    ("current_temp", "get_temperature", ("temperature",), None),
+    ("fan_speed", "get_fan_speed", ("fan_speed", "config_fan_map"), None),
+    ("power", "is_on", ("power",), None),
+    ("min_temp", "get_min_setpoint", ("setpoint_min",), None),
+    ("max_temp", "get_max_setpoint", ("setpoint_max",), None),
+    ("target_temp", "get_setpoint", ("setpoint",), None),
+    ("outdoor_temp", "get_outdoor_temperature", ("outdoor_temp",), None),
+    ("hvac_mode", "get_mode", ("mode", "operating_mode"), MAP_IH_TO_HVAC_MODE),
+    ("preset", "get_preset_mode", ("climate_working_mode",), MAP_IH_TO_PRESET_MODE),
+    ("vvane", "get_vertical_swing", ("vvane",), None),
+    ("hvane", "get_horizontal_swing", ("hvane",), None),
+)
+MAP_KEY_TO_STATE_FIELDS = {
+    key: tuple(field for field in STATE_FIELDS if key in field[2])
+    for key in {key for field in STATE_FIELDS for key in field[2]}
+}
+
+
+class ClimateState:
+    """Values a climate entity shows, kept in slots since large installs have hundreds."""
+
+    __slots__ = tuple(field[0] for field in STATE_FIELDS)
+
+    def __init__(self) -> None:
+        """Initialize an empty state."""
+        for slot in self.__slots__:
+            setattr(self, slot, None)
+        self.power = False
+
+
+class ClimateOptions(NamedTuple):
+    """Features and option lists of a capability profile, shared by every entity with that profile."""
+
+    supported_features: ClimateEntityFeature
+    hvac_modes: tuple[HVACMode, ...]
+    fan_modes: tuple[str, ...]
+    swing_modes: tuple[str, ...]
+    swing_horizontal_modes: tuple[str, ...]
+
+
+@cache
+def _climate_options(capabilities: DeviceCapabilities) -> ClimateOptions:
+    """Return the features and option lists of a profile, once per distinct profile."""
+    features = ClimateEntityFeature.TURN_ON | ClimateEntityFeature.TURN_OFF
+    if capabilities.setpoint_control:
+        features |= ClimateEntityFeature.TARGET_TEMPERATURE
+    if capabilities.vertical_swing:
+        features |= ClimateEntityFeature.SWING_MODE
+    if capabilities.horizontal_swing:
+        features |= ClimateEntityFeature.SWING_HORIZONTAL_MODE
+    if capabilities.fan_speeds:
+        features |= ClimateEntityFeature.FAN_MODE
+    if capabilities.preset_mode:
+        features |= ClimateEntityFeature.PRESET_MODE
+
+    hvac_modes = []
+    for mode in capabilities.modes:
+        if mode in MAP_IH_TO_HVAC_MODE:
+            hvac_modes.append(MAP_IH_TO_HVAC_MODE[mode])
+        else:
+            _LOGGER.warning("Unexpected mode: %s", mode)
+    hvac_modes.append(HVACMode.OFF)
+    return ClimateOptions(
+        features,
+        tuple(hvac_modes),
+        capabilities.fan_speeds,
+        SWING_MODES_VERTICAL if capabilities.vertical_swing else SWING_MODES_OFF,
+        SWING_MODES_HORIZONTAL if capabilities.horizontal_swing else SWING_MODES_OFF,
+    )
 
 
 async def async_setup_entry(
@@ -99,12 +171,12 @@ async def async_setup_entry(
 ) -> None:
     """Create climate entities from config flow."""
     config = config_entry.data
-    controller = hass.data[DOMAIN]["controller"].get(config_entry.unique_id)
-    ih_devices = controller.get_devices()
+    manager = hass.data[DOMAIN]["controller"].get(config_entry.entry_id)
+    ih_devices = manager.get_devices()
     if ih_devices:
         async_add_entities(
             [
-                IntesisAC(ih_device_id, device, controller)
+                IntesisAC(ih_device_id, device, manager)
                 for ih_device_id, device in ih_devices.items()
             ],
             update_before_add=True,
@@ -112,89 +184,49 @@ async def async_setup_entry(
     else:
         _LOGGER.warning("No devices found in controller for climate platform")
 
-# pylint: disable=too-many-instance-attributes, too-many-arguments, too-many-public-methods
-class IntesisAC(ClimateEntity):
+# pylint: disable=too-many-arguments, too-many-public-methods
+class IntesisAC(IntesisEntity, ClimateEntity):
     """Represents an IntesisACCloud air conditioning device."""
 
     _enable_turn_on_off_backwards_compatibility = False
 
-    def __init__(self, ih_device_id, ih_device, controller) -> None:
+    def __init__(self, ih_device_id, ih_device, manager) -> None:
         """Initialize the thermostat."""
-        self._controller: IntesisBase = controller
+        self._manager = manager
+        self._controller: IntesisBase = manager.controller
         self._device_id: str = ih_device_id
-        self._ih_device: dict[str, dict[str, object]] = ih_device
         self._device_name: str = ih_device.get("name")
-        self._device_type: str = controller.device_type
         self._connected: bool = False
-        self._setpoint_step: float = 1.0
-        self._current_temp: float = None
-        self._max_temp: float = None
-        self._attr_hvac_modes = []
-        self._min_temp: int = None
-        self._target_temp: float = None
-        self._outdoor_temp: float = None
-        self._hvac_mode: HVACMode = None
-        self._preset: str = None
-        self._preset_list: list[str] = [PRESET_ECO, PRESET_COMFORT, PRESET_BOOST]
-        self._run_hours: int = None
-        self._rssi = None
-        self._swing_list: list[str] = [SWING_OFF]
-        self._swing_horizontal_list: list[str] = [SWING_OFF]
-        self._vvane: str = None
-        self._hvane: str = None
-        self._power: bool = False
-        self._fan_speed = None
-        self._attr_supported_features = 0
-        self._power_consumption_heat = None
-        self._power_consumption_cool = None
-
-        # On / off support
-        self._attr_supported_features |= ClimateEntityFeature.TURN_ON
-        self._attr_supported_features |= ClimateEntityFeature.TURN_OFF
-
-        # Setpoint support
-        if controller.has_setpoint_control(ih_device_id):
-            self._attr_supported_features |= ClimateEntityFeature.TARGET_TEMPERATURE
-
-        # Setup swing list
-        if controller.has_vertical_swing(ih_device_id):
-            self._swing_list.append(SWING_VERTICAL)
-        if len(self._swing_list) > 1:
-            self._attr_supported_features |= ClimateEntityFeature.SWING_MODE
-        if controller.has_horizontal_swing(ih_device_id):
-            self._swing_horizontal_list.append(SWING_HORIZONTAL)
-        if len(self._swing_horizontal_list) > 1:
-            self._attr_supported_features |= ClimateEntityFeature.SWING_HORIZONTAL_MODE
-
-        # Setup fan speeds
-        self._fan_modes = controller.get_fan_speed_list(ih_device_id)
-        if self._fan_modes:
-            self._attr_supported_features |= ClimateEntityFeature.FAN_MODE
-
-        # Preset support
-        if ih_device.get("climate_working_mode"):
-            self._attr_supported_features |= ClimateEntityFeature.PRESET_MODE
-
-        # Setup HVAC modes
-        if modes := controller.get_mode_list(ih_device_id):
-            mode_list = []
-            for mode in modes:
-                if mode in MAP_IH_TO_HVAC_MODE:
-                    mode_list.append(MAP_IH_TO_HVAC_MODE[mode])
-                else:
-                    _LOGGER.warning("Unexpected mode: %s", mode)
-            self._attr_hvac_modes.extend(mode_list)
-        self._attr_hvac_modes.append(HVACMode.OFF)
+        self._state = ClimateState()
+        self._apply_capabilities(manager.get_capabilities(ih_device_id))
+
+    def _apply_capabilities(self, capabilities: DeviceCapabilities) -> None:
+        """Take the features and option lists from the device's capability profile.
+
+        The options are derived once per distinct profile and shared by every
+        entity with that profile, so entities only hold references to them.
+        """
+        self._capabilities = capabilities
+        self._options = _climate_options(capabilities)
 
     async def async_added_to_hass(self):
         """Subscribe to event updates."""
-        _LOGGER.debug("Added climate device with state: %s", repr(self._ih_device))
-        self._controller.add_update_callback(self.async_update_callback)
+        _LOGGER.debug("Added climate device with state: %s", repr(self._controller.get_device(self._device_id)))
+        # The manager is the only subscriber on the controller; entities
+        # always subscribe through it so each frame wakes them exactly once.
+        self.async_on_remove(
+            self._manager.async_subscribe(self._device_id, self.async_update_callback)
+        )
 
         if self._device_type is not DEVICE_INTESISBOX:
             # Controller is already connected in __init__.py
             pass
 
+    @property
+    def _device_type(self) -> str:
+        """Return the type of controller the device is reached through."""
+        return self._manager.device_type
+
     @property
     def name(self):
         """Return the name of the AC device."""
@@ -209,16 +241,9 @@ class IntesisAC(ClimateEntity):
     def extra_state_attributes(self):
         """Return the device specific state attributes."""
         attrs = {}
-        if self._outdoor_temp is not None:
-            attrs["outdoor_temp"] = self._outdoor_temp
-        if self._power_consumption_heat:
-            attrs["power_consumption_heat_kw"] = round(
-                self._power_consumption_heat / 1000, 1
-            )
-        if self._power_consumption_cool:
-            attrs["power_consumption_cool_kw"] = round(
-                self._power_consumption_cool / 1000, 1
-            )
+        if self._state.outdoor_temp is not None:
+            attrs["outdoor_temp"] = self._state.outdoor_temp
+        # Power consumption, RSSI and run hours are exposed as sensors
 
         return attrs
 
@@ -230,27 +255,29 @@ class IntesisAC(ClimateEntity):
     @property
     def target_temperature_step(self) -> float:
         """Return whether setpoint should be whole or half degree precision."""
-        return self._setpoint_step
+        return 1.0
 
     @property
     def preset_modes(self):
         """Return a list of HVAC preset modes."""
-        return self._preset_list
+        return PRESET_MODES
 
     @property
     def preset_mode(self):
         """Return the current preset mode."""
-        return self._preset
+        return self._state.preset
 
     async def async_turn_on(self) -> None:
         """Turn device on."""
-        self._power = True
-        await self._controller.set_power_on(self._device_id)
+        await self._async_send_commands({"power": ("set_power_on",)})
+        self._set_optimistic("power", True, "power")
+        self.async_write_ha_state()
 
     async def async_turn_off(self) -> None:
         """Turn device off."""
-        self._power = False
-        await self._controller.set_power_off(self._device_id)
+        await self._async_send_commands({"power": ("set_power_off",)})
+        self._set_optimistic("power", False, "power")
+        self.async_write_ha_state()
 
     async def async_toggle(self) -> None:
         """Toggle device status."""
@@ -259,15 +286,58 @@ class IntesisAC(ClimateEntity):
         else:
             await self.async_turn_off()
 
+    async def _async_send_commands(self, commands) -> None:
+        """Send commands through the manager, which batches them per device."""
+        await self._manager.async_send_commands(self._device_id, commands)
+
+    @core.callback
+    def _set_optimistic(self, attribute: str, value, command: str) -> None:
+        """Show a value that was sent until the device confirms or the command times out."""
+        self._async_set_pending(attribute, value, command)
+        setattr(self._state, attribute, value)
+
+    def _shown_value(self, key: str):
+        """Return the value of a state slot."""
+        return getattr(self._state, key)
+
+    def _hvac_mode_commands(self, hvac_mode: HVACMode) -> dict[str, tuple]:
+        """Return the commands that switch the device to an HVAC mode."""
+        if hvac_mode == HVACMode.OFF:
+            return {"power": ("set_power_off",)}
+
+        # Powering on is skipped by the batcher when the device already is on
+        commands = {
+            "power": ("set_power_on",),
+            "mode": ("set_mode", MAP_HVAC_MODE_TO_IH[hvac_mode]),
+        }
+        # Send the temperature again in case changing modes has changed it
+        if self._state.target_temp:
+            commands["setpoint"] = ("set_temperature", self._state.target_temp)
+        return commands
+
+    def _set_local_hvac_mode(self, hvac_mode: HVACMode) -> None:
+        """Reflect a requested HVAC mode before the device confirms it."""
+        self._set_optimistic("power", hvac_mode != HVACMode.OFF, "hvac_mode")
+        if self._state.power:
+            self._set_optimistic("hvac_mode", hvac_mode, "hvac_mode")
+
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
+        commands = {}
         if hvac_mode := kwargs.get(ATTR_HVAC_MODE):
-            await self.async_set_hvac_mode(hvac_mode)
+            _LOGGER.debug("Setting %s to %s mode", self._device_type, hvac_mode)
+            commands.update(self._hvac_mode_commands(hvac_mode))
 
         if temperature := kwargs.get(ATTR_TEMPERATURE):
             _LOGGER.debug("Setting %s to %s degrees", self._device_type, temperature)
-            await self._controller.set_temperature(self._device_id, temperature)
-            self._target_temp = temperature
+            # Replaces the setpoint the mode change would have sent again
+            commands["setpoint"] = ("set_temperature", temperature)
+
+        await self._async_send_commands(commands)
+        if hvac_mode:
+            self._set_local_hvac_mode(hvac_mode)
+        if temperature:
+            self._set_optimistic("target_temp", temperature, "temperature")
 
         # Write updated temperature to HA state to avoid flapping (API confirmation is slow)
         self.async_write_ha_state()
@@ -275,60 +345,46 @@ class IntesisAC(ClimateEntity):
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set operation mode."""
         _LOGGER.debug("Setting %s to %s mode", self._device_type, hvac_mode)
-        if hvac_mode == HVACMode.OFF:
-            self._power = False
-            await self._controller.set_power_off(self._device_id)
-            # Write changes to HA, API can be slow to push changes
-            self.async_write_ha_state()
-            return
-
-        # First check device is turned on
-        if not self._controller.is_on(self._device_id):
-            self._power = True
-            await self._controller.set_power_on(self._device_id)
-
-        # Set the mode
-        await self._controller.set_mode(self._device_id, MAP_HVAC_MODE_TO_IH[hvac_mode])
-
-        # Send the temperature again in case changing modes has changed it
-        if self._target_temp:
-            await self._controller.set_temperature(self._device_id, self._target_temp)
+        await self._async_send_commands(self._hvac_mode_commands(hvac_mode))
 
         # Updates can take longer than 2 seconds, so update locally
-        self._hvac_mode = hvac_mode
+        self._set_local_hvac_mode(hvac_mode)
         self.async_write_ha_state()
 
     async def async_set_fan_mode(self, fan_mode):
         """Set fan mode (from quiet, low, medium, high, auto)."""
-        await self._controller.set_fan_speed(self._device_id, fan_mode)
+        await self._async_send_commands({"fan_speed": ("set_fan_speed", fan_mode)})
 
         # Updates can take longer than 2 seconds, so update locally
-        self._fan_speed = fan_mode
+        self._set_optimistic("fan_speed", fan_mode, "fan_mode")
         self.async_write_ha_state()
 
     async def async_set_preset_mode(self, preset_mode):
         """Set preset mode."""
         ih_preset_mode = MAP_PRESET_MODE_TO_IH.get(preset_mode)
-        await self._controller.set_preset_mode(self._device_id, ih_preset_mode)
+        await self._async_send_commands({"preset": ("set_preset_mode", ih_preset_mode)})
+        self._set_optimistic("preset", preset_mode, "preset_mode")
+        self.async_write_ha_state()
 
     async def async_set_swing_mode(self, swing_mode):
         """Set the vertical vane."""
         if swingmode := MAP_SWING_TO_IH.get(swing_mode):
-            await self._controller.set_vertical_vane(
-                self._device_id, swingmode
-            )
+            await self._async_send_commands({"vvane": ("set_vertical_vane", swingmode)})
+            self._set_optimistic("vvane", swingmode, "swing_mode")
+            self.async_write_ha_state()
 
     async def async_set_swing_horizontal_mode(self, swing_mode):
         """Set the horizontal vane."""
         if swingmode := MAP_HORIZONTAL_SWING_TO_IH.get(swing_mode):
-            await self._controller.set_horizontal_vane(
-                self._device_id, swingmode
-            )
+            await self._async_send_commands({"hvane": ("set_horizontal_vane", swingmode)})
+            self._set_optimistic("hvane", swingmode, "swing_horizontal_mode")
+            self.async_write_ha_state()
 
-    async def async_update(self):
+    @core.callback
+    def _async_refresh_from_controller(self):
         """Copy values from controller dictionary to climate device."""
         # Update values from controller's device dictionary
-        self._connected = self._controller.is_connected
+        self._connected = self._manager.is_connected
         _LOGGER.debug("Climate entity update. Connected: %s", self._connected)
 
         if not self._controller.get_device(self._device_id):
@@ -337,129 +393,87 @@ class IntesisAC(ClimateEntity):
             )
             return
 
-        self._current_temp = self._controller.get_temperature(self._device_id)
-        self._fan_speed = self._controller.get_fan_speed(self._device_id)
-        self._power = self._controller.is_on(self._device_id)
-        self._min_temp = self._controller.get_min_setpoint(self._device_id)
-        self._max_temp = self._controller.get_max_setpoint(self._device_id)
-        self._rssi = self._controller.get_rssi(self._device_id)
-        self._run_hours = self._controller.get_run_hours(self._device_id)
-        self._target_temp = self._controller.get_setpoint(self._device_id)
-        self._outdoor_temp = self._controller.get_outdoor_temperature(self._device_id)
-
-        # Operation mode
-        mode = self._controller.get_mode(self._device_id)
-        self._hvac_mode = MAP_IH_TO_HVAC_MODE.get(mode)
-
-        # Preset mode
-        preset = self._controller.get_preset_mode(self._device_id)
-        self._preset = MAP_IH_TO_PRESET_MODE.get(preset)
-
-        # Swing mode
-        self._vvane = self._controller.get_vertical_swing(self._device_id)
-        self._hvane = self._controller.get_horizontal_swing(self._device_id)
-
-        # Power usage
-        self._power_consumption_heat = self._controller.get_heat_power_consumption(
-            self._device_id
-        )
-        self._power_consumption_cool = self._controller.get_cool_power_consumption(
-            self._device_id
-        )
-
-        if not self._attr_supported_features:
-            if self._fan_modes:
-                self._attr_supported_features |= ClimateEntityFeature.FAN_MODE
-            if self._controller.has_setpoint_control(self._device_id):
-                self._attr_supported_features |= ClimateEntityFeature.TARGET_TEMPERATURE
-            if len(self._swing_list) > 1:
-                self._attr_supported_features |= ClimateEntityFeature.SWING_MODE
-            if len(self._swing_horizontal_list) > 1:
-                self._attr_supported_features |= ClimateEntityFeature.SWING_HORIZONTAL_MODE
-            if self._ih_device.get("climate_working_mode"):
-                self._attr_supported_features |= ClimateEntityFeature.PRESET_MODE
-
-    async def async_will_remove_from_hass(self):
-        """Shutdown the controller when the device is being removed."""
-        self._controller.remove_update_callback(self.async_update_callback)
+        self._apply_state_fields(STATE_FIELDS)
 
     @property
     def icon(self):
         """Return the icon for the current state."""
         icon = None
-        if self._power:
-            icon = MAP_STATE_ICONS.get(self._hvac_mode)
+        if self._state.power:
+            icon = MAP_STATE_ICONS.get(self._state.hvac_mode)
         return icon
 
-    async def async_update_callback(self, device_id=None):
+    def _apply_state_fields(self, fields) -> set[str]:
+        """Refresh the given fields from the controller and return those that changed."""
+        changed = set()
+        for attribute, getter, _keys, value_map in fields:
+            value = getattr(self._controller, getter)(self._device_id)
+            if value_map is not None:
+                value = value_map.get(value)
+            value = self._async_resolve_pending(attribute, value)
+            if getattr(self._state, attribute) != value:
+                setattr(self._state, attribute, value)
+                changed.add(attribute)
+        return changed
+
+    def _async_apply_changed_keys(self, changed_keys) -> None:
+        """Recompute only the attributes derived from the changed device keys."""
+        if not self._controller.get_device(self._device_id):
+            return
+
+        # Keyed by attribute, value maps make the field tuples unhashable
+        fields = {
+            field[0]: field
+            for key in changed_keys
+            for field in MAP_KEY_TO_STATE_FIELDS.get(key, ())
+        }
+        if self._apply_state_fields(fields.values()):
+            self.async_write_ha_state()
+
+    async def async_update_callback(self, device_id=None, changed_keys=None):
         """Let HA know there has been an update from the controller."""
-        # Track changes in connection state
-        if self._controller and not self._controller.is_connected and self._connected:
-            # Connection has dropped
+        # Track changes in connection state, the manager handles reconnecting
+        if not self._manager.is_connected and self._connected:
             self._connected = False
-            reconnect_seconds = 30
-            if self._device_type in [
-                DEVICE_INTESISHOME,
-                DEVICE_ANYWAIR,
-                DEVICE_AIRCONWITHME,
-            ]:
-                # Add a random delay for cloud connections
-                reconnect_seconds = randrange(10, 30)
-
-            _LOGGER.info(
-                "Connection to %s API was lost. Reconnecting in %i seconds",
-                self._device_type,
-                reconnect_seconds,
-            )
+            _LOGGER.debug("Connection to %s API was lost", self._device_type)
 
-            async def try_connect(retries):
-                try:
-                    await self._controller.connect()
-                    _LOGGER.info("Reconnected to %s API", self._device_type)
-                except IHConnectionError:
-                    wait_time = min(2**retries, MAX_WAIT_TIME)
-                    _LOGGER.info(
-                        "Failed to reconnect to %s API. Retrying in %i seconds",
-                        self._device_type,
-                        wait_time,
-                    )
-                    async_call_later(self.hass, wait_time, try_connect(retries + 1))
-
-                async_call_later(self.hass, reconnect_seconds, try_connect(0))
-
-        if self._controller.is_connected and not self._connected:
+        if self._manager.is_connected and not self._connected:
             # Connection has been restored
             self._connected = True
             _LOGGER.debug("Connection to %s API was restored", self._device_type)
 
-        if not device_id or self._device_id == device_id:
-            # Update all devices if no device_id was specified
-            self.async_schedule_update_ha_state(True)
+        # The manager rebuilds the profile when the device's model or zones change
+        if (capabilities := self._manager.get_capabilities(self._device_id)) is not self._capabilities:
+            self._apply_capabilities(capabilities)
+            changed_keys = None
+
+        # The manager only calls us for our own device or a broadcast. When it
+        # knows which keys changed, only the affected attributes are refreshed.
+        if changed_keys is None or not self._connected:
+            self._async_refresh_from_controller()
+            self.async_write_ha_state()
+        else:
+            self._async_apply_changed_keys(changed_keys)
 
     @property
     def min_temp(self):
         """Return the minimum temperature for the current mode of operation."""
-        return self._min_temp
+        return self._state.min_temp
 
     @property
     def max_temp(self):
         """Return the maximum temperature for the current mode of operation."""
-        return self._max_temp
-
-    @property
-    def should_poll(self):
-        """Poll for updates if pyIntesisHome doesn't have a socket open."""
-        return True
+        return self._state.max_temp
 
     @property
     def fan_mode(self):
         """Return whether the fan is on."""
-        return self._fan_speed
+        return self._state.fan_speed
 
     @property
     def swing_mode(self):
         """Return current vertical swing mode."""
-        if self._vvane == IH_SWING_SWING:
+        if self._state.vvane == IH_SWING_SWING:
             swing = SWING_VERTICAL
         else:
             swing = SWING_OFF
@@ -468,7 +482,7 @@ class IntesisAC(ClimateEntity):
     @property
     def swing_horizontal_mode(self):
         """Return current horizontal swing mode."""
-        if self._hvane == IH_SWING_SWING:
+        if self._state.hvane == IH_SWING_SWING:
             swing = SWING_HORIZONTAL
         else:
             swing = SWING_OFF
@@ -477,38 +491,51 @@ class IntesisAC(ClimateEntity):
     @property
     def fan_modes(self):
         """List of available fan modes."""
-        return self._fan_modes
+        return self._options.fan_modes
 
     @property
     def swing_modes(self):
         """List of available vertical swing positions."""
-        return self._swing_list
+        return self._options.swing_modes
 
     @property
     def swing_horizontal_modes(self):
         """List of available horizontal swing positions."""
-        return self._swing_horizontal_list
+        return self._options.swing_horizontal_modes
+
+    @property
+    def supported_features(self) -> ClimateEntityFeature:
+        """Return the features the device's capability profile supports."""
+        return self._options.supported_features
+
+    @property
+    def hvac_modes(self) -> tuple[HVACMode, ...]:
+        """Return the HVAC modes the device's capability profile supports."""
+        return self._options.hvac_modes
 
     @property
     def available(self) -> bool:
-        """If the device hasn't been able to connect, mark as unavailable."""
-        return self._connected or self._connected is None
+        """If the device hasn't been able to connect, mark as unavailable.
+
+        Devices restored from the snapshot stay available with their last known state.
+        """
+        return self._connected or self._connected is None or self._manager.is_restored
 
     @property
     def current_temperature(self) -> float | None:
         """Return the current temperature."""
-        return self._current_temp
+        return self._state.current_temp
 
     @property
     def hvac_mode(self) -> HVACMode:
         """Return the current mode of operation if unit is on."""
-        if self._power:
-            return self._hvac_mode
+        if self._state.power:
+            return self._state.hvac_mode
         return HVACMode.OFF
 
     @property
     def target_temperature(self) -> float | None:
         """Return the current setpoint temperature if unit is on."""
-        if self._power and self.hvac_mode not in [HVACMode.FAN_ONLY, HVACMode.OFF]:
-            return self._target_temp
+        if self._state.power and self.hvac_mode not in [HVACMode.FAN_ONLY, HVACMode.OFF]:
+            return self._state.target_temp
         return None
@@ -0,0 +1,142 @@
+"""Command queueing and batching for the IntesisACCloud integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds commands for one device are collected before they are sent
+COMMAND_BATCH_WINDOW = 0.05
+
+# Commands that may wait to be sent to one device, counted per call waiting for its batch
+MAX_QUEUED_COMMANDS = 16
+
+CONF_DEVICE_COMMAND_INTERVAL = "device_command_interval"
+CONF_ACCOUNT_COMMAND_INTERVAL = "account_command_interval"
+# Minimum milliseconds between batches sent to one device, and to the whole account
+DEFAULT_DEVICE_COMMAND_INTERVAL = 500
+DEFAULT_ACCOUNT_COMMAND_INTERVAL = 100
+
+# The commands that have to reach the device before any other in their batch,
+# a mode change can reset the setpoint so the mode goes before it
+POWER_COMMAND = "power"
+MODE_COMMAND = "mode"
+
+
+class RateLimiter:
+    """Spaces consecutive events by a minimum interval."""
+
+    def __init__(self, interval: float) -> None:
+        """Initialize the limiter with an interval in seconds."""
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._last = None
+
+    async def async_wait(self) -> None:
+        """Wait until the interval since the previous event has passed."""
+        async with self._lock:
+            if self._last is not None:
+                if (wait := self._last + self.interval - time.monotonic()) > 0:
+                    await asyncio.sleep(wait)
+            self._last = time.monotonic()
+
+
+class CommandBatcher:
+    """Merges the commands for one device and sends them as a single batch.
+
+    Commands are keyed by what they change, so a later command for the same
+    key replaces an earlier one that has not been sent yet. Batches are
+    spaced by the device and account rate limits, commands keep merging
+    while a batch waits for them.
+    """
+
+    def __init__(self, manager, device_id, rate_limiter: RateLimiter) -> None:
+        """Initialize the batcher."""
+        self._manager = manager
+        self._device_id = device_id
+        self._rate_limiter = rate_limiter
+        self._pending = {}
+        self._waiters = []
+        self._flush_task = None
+
+    async def async_send(self, commands: dict[str, tuple]) -> None:
+        """Queue commands and wait until the batch they were merged into is sent."""
+        if len(self._waiters) >= MAX_QUEUED_COMMANDS:
+            self._manager.stats["commands_dropped"] += len(commands)
+            raise HomeAssistantError(f"Too many commands are waiting to be sent to device {self._device_id}")
+
+        for key, command in commands.items():
+            if self._pending.pop(key, None) is not None:
+                self._manager.stats["commands_merged"] += 1
+            self._pending[key] = command
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._flush_task is None:
+            self._flush_task = self._manager.config_entry.async_create_background_task(
+                self._manager.hass,
+                self._async_flush(),
+                f"intesisaccloud commands {self._device_id}",
+            )
+        await waiter
+
+    def cancel(self) -> None:
+        """Cancel a batch that has not been sent yet."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        for waiter in self._waiters:
+            waiter.cancel()
+        self._waiters.clear()
+        self._pending.clear()
+
+    async def _async_flush(self) -> None:
+        """Send everything collected during the batch window."""
+        await asyncio.sleep(COMMAND_BATCH_WINDOW)
+        await self._rate_limiter.async_wait()
+        await self._manager.account_rate_limiter.async_wait()
+        commands, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, []
+        self._flush_task = None
+
+        try:
+            await self._async_send_batch(commands)
+        except Exception as ex:  # pylint: disable=broad-except
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(ex)
+        else:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def _async_send_batch(self, commands: dict[str, tuple]) -> None:
+        """Send a merged batch in order, powering the unit on and setting its mode first."""
+        controller = self._manager.controller
+        self._manager.stats["command_batches"] += 1
+
+        if power := commands.pop(POWER_COMMAND, None):
+            if power[0] == "set_power_on" and controller.is_on(self._device_id):
+                self._manager.stats["commands_deduplicated"] += 1
+            else:
+                await self._async_call(power)
+
+        if mode := commands.pop(MODE_COMMAND, None):
+            await self._async_call(mode)
+
+        # Commands are not sent concurrently, the cloud may fall back to
+        # separate portal requests that do not arrive in the order they were made.
+        for command in commands.values():
+            await self._async_call(command)
+
+    async def _async_call(self, command: tuple) -> None:
+        """Send a single command to the controller."""
+        method, *args = command
+        _LOGGER.debug("Sending %s%s to device %s", method, tuple(args), self._device_id)
+        self._manager.stats["commands_sent"] += 1
+        await getattr(self._manager.controller, method)(self._device_id, *args)
@@ -2,16 +2,27 @@
 """Config flow for IntesisACCloud."""
 from __future__ import annotations
 
+from collections.abc import Mapping
 import logging
+import time
+from typing import Any
+
 from pyintesishome import IntesisBase
 
 import voluptuous as vol
 from homeassistant import config_entries, exceptions
-from homeassistant.const import CONF_DEVICE, CONF_HOST, CONF_PASSWORD, CONF_USERNAME
-from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import CONF_DEVICE, CONF_HOST, CONF_PASSWORD, CONF_SCAN_INTERVAL, CONF_USERNAME
+from homeassistant.core import callback
+from homeassistant.data_entry_flow import AbortFlow, FlowResult
 
 from . import DOMAIN
+from .commands import (
+    CONF_ACCOUNT_COMMAND_INTERVAL,
+    CONF_DEVICE_COMMAND_INTERVAL,
+    DEFAULT_ACCOUNT_COMMAND_INTERVAL,
+    DEFAULT_DEVICE_COMMAND_INTERVAL,
+)
+from .manager import CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW, DEFAULT_SCAN_INTERVAL, create_controller
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -69,13 +80,7 @@ class IntesisConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
         controller: IntesisBase | None = None
 
-        from pyintesishome import (
-            IHAuthenticationError,
-            IHConnectionError,
-            IntesisBox,
-            IntesisHome,
-            IntesisHomeLocal,
-        )
+        from pyintesishome import IHAuthenticationError, IHConnectionError
         from pyintesishome.const import (
             DEVICE_AIRCONWITHME,
             DEVICE_ANYWAIR,
@@ -109,47 +114,31 @@ class IntesisConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
         if user_input and CONF_DEVICE in user_input:
-            # Select the correct controller
             device_type = user_input[CONF_DEVICE]
-            if device_type == DEVICE_INTESISBOX:
-                controller = IntesisBox(user_input[CONF_HOST], loop=self.hass.loop)
-            elif device_type == DEVICE_INTESISHOME_LOCAL:
-                controller = IntesisHomeLocal(
-                    user_input[CONF_HOST],
-                    user_input[CONF_USERNAME],
-                    user_input[CONF_PASSWORD],
-                    loop=self.hass.loop,
-                    websession=async_get_clientsession(self.hass),
-                )
-            else:
-                controller = IntesisHome(
-                    username=user_input[CONF_USERNAME],
-                    password=user_input[CONF_PASSWORD],
-                    loop=self.hass.loop,
-                    device_type=device_type,
-                    websession=async_get_clientsession(self.hass),
-                )
+            controller = create_controller(self.hass, user_input)
 
-        # Try to attempt a connection
+        # Try to attempt a connection. This is the full login and device
+        # download, setup adopts the connected controller instead of repeating it.
         try:
-            if controller and isinstance(controller, IntesisBox):
+            if controller:
                 await controller.connect()
-            elif controller:
-                await controller.poll_status()
         except IHAuthenticationError:
             errors["base"] = "invalid_auth"
-            controller = None
         except IHConnectionError:
             errors["base"] = "cannot_connect"
-            controller = None
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Unexpected exception")
             errors["base"] = "unknown"
+
+        if controller and errors:
+            # Close the session and sockets the failed login may have opened
+            await controller.stop()
             controller = None
 
         if controller:
             if len(controller.get_devices()) == 0:
                 errors["base"] = "no_devices"
+                await controller.stop()
 
             if "base" not in errors:
                 unique_id = (
@@ -158,12 +147,19 @@ class IntesisConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 name = f"{controller.device_type} {controller.name}"
 
                 await self.async_set_unique_id(unique_id)
-                self._abort_if_unique_id_configured()
+                try:
+                    self._abort_if_unique_id_configured()
+                except AbortFlow:
+                    await controller.stop()
+                    raise
 
-                # Pass the controller through to the platform setup
+                # Hand the connected controller over to async_setup_entry
                 self.hass.data.setdefault(DOMAIN, {})
-                self.hass.data[DOMAIN].setdefault("controller", {})
-                self.hass.data[DOMAIN]["controller"][unique_id] = controller
+                self.hass.data[DOMAIN].setdefault("flow_controllers", {})
+                self.hass.data[DOMAIN]["flow_controllers"][unique_id] = {
+                    "controller": controller,
+                    "created": time.monotonic(),
+                }
 
                 return self.async_create_entry(
                     title=name,
@@ -183,10 +179,86 @@ class IntesisConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="details", data_schema=cloud_schema, errors=errors
         )
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Ask for new credentials after the API rejected the stored ones."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None) -> FlowResult:
+        """Check the new credentials and reload the entry with them."""
+        from pyintesishome import IHAuthenticationError, IHConnectionError
+
+        entry = self._get_reauth_entry()
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            controller = create_controller(self.hass, {**entry.data, **user_input})
+            try:
+                await controller.connect()
+            except IHAuthenticationError:
+                errors["base"] = "invalid_auth"
+            except IHConnectionError:
+                errors["base"] = "cannot_connect"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            finally:
+                await controller.stop()
+            if not errors:
+                return self.async_update_reload_and_abort(entry, data_updates=user_input)
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_USERNAME, default=entry.data.get(CONF_USERNAME)): str,
+                    vol.Required(CONF_PASSWORD): str,
+                }
+            ),
+            errors=errors,
+            description_placeholders={"name": entry.title},
+        )
+
     async def async_step_import(self, import_data) -> FlowResult:
         """Handle configuration by yaml file."""
         return await self.async_step_user(import_data)
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow for this handler."""
+        return IntesisOptionsFlow()
+
+
+class IntesisOptionsFlow(config_entries.OptionsFlow):
+    """Handle IntesisACCloud options."""
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        options_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_SCAN_INTERVAL,
+                    default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                vol.Required(
+                    CONF_COALESCE_WINDOW,
+                    default=options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+                vol.Required(
+                    CONF_DEVICE_COMMAND_INTERVAL,
+                    default=options.get(CONF_DEVICE_COMMAND_INTERVAL, DEFAULT_DEVICE_COMMAND_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+                vol.Required(
+                    CONF_ACCOUNT_COMMAND_INTERVAL,
+                    default=options.get(CONF_ACCOUNT_COMMAND_INTERVAL, DEFAULT_ACCOUNT_COMMAND_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=options_schema)
+
 
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
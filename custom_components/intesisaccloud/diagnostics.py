@@ -0,0 +1,80 @@
+"""Diagnostics support for the IntesisACCloud integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from . import DOMAIN
+from .metrics import LatencyHistogram
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME}
+
+# Percentiles reported for command latencies
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def _latency_summary(histogram: LatencyHistogram) -> dict[str, Any]:
+    """Return a histogram together with its percentiles."""
+    return {
+        **histogram.as_dict(),
+        "percentiles_ms": {f"p{percent}": histogram.percentile(percent) for percent in LATENCY_PERCENTILES},
+    }
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+    }
+    if (manager := hass.data.get(DOMAIN, {}).get("controller", {}).get(entry.entry_id)) is None:
+        return diagnostics
+
+    now = dt_util.utcnow()
+    diagnostics.update(
+        {
+            "connection": {
+                "connected": manager.is_connected,
+                "controller_connected": manager.controller.is_connected,
+                "current_backoff": manager.current_backoff,
+                "reconnect_history": list(manager.reconnect_history),
+                "time_to_reconnect": manager.time_to_reconnect.as_dict(),
+                "outage_duration": manager.outage_duration.as_dict(),
+                "startup_timings": manager.startup_timings,
+            },
+            "listeners": {
+                "count": manager.listener_count,
+                "latency": {name: histogram.as_dict() for name, histogram in manager.listener_latency.items()},
+            },
+            "updates": {
+                "callback_interval": manager.callback_interval.as_dict(),
+                "dispatch_latency": manager.dispatch_latency.as_dict(),
+                "stats": dict(manager.stats),
+            },
+            "devices": {
+                device_id: {
+                    "last_update_age": (
+                        round((now - last_update).total_seconds(), 1)
+                        if (last_update := manager.device_last_update.get(device_id)) is not None
+                        else None
+                    ),
+                }
+                for device_id in manager.get_devices()
+            },
+            "commands": {
+                "round_trip": _latency_summary(manager.command_latency),
+                "confirm": {
+                    command: _latency_summary(histogram) for command, histogram in manager.confirm_latency.items()
+                },
+            },
+        }
+    )
+    return diagnostics
@@ -0,0 +1,139 @@
+"""Base entity for the IntesisACCloud integration."""
+
+from __future__ import annotations
+
+import logging
+import time
+from functools import partial
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later
+
+from .metrics import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds an optimistic value is shown before the device must have confirmed it
+PENDING_COMMAND_TIMEOUT = 15
+
+
+class PendingCommand:
+    """Value set by a command that the device has not reported back yet."""
+
+    __slots__ = ("value", "command", "started", "cancel_timeout")
+
+    def __init__(self, value, command, started, cancel_timeout) -> None:
+        """Initialize the pending command."""
+        self.value = value
+        self.command = command
+        self.started = started
+        self.cancel_timeout = cancel_timeout
+
+
+class IntesisEntity(Entity):
+    """Entity fed by an IntesisManager that only writes state when it changes."""
+
+    # Updates are pushed; the manager polls on our behalf while the socket is down
+    _attr_should_poll = False
+    _last_fingerprint: tuple | None = None
+    _pending_commands: dict[str, PendingCommand] | None = None
+
+    def _state_fingerprint(self) -> tuple:
+        """Return everything about the entity that ends up in its state object."""
+        return (
+            self.available,
+            self.state,
+            self.capability_attributes,
+            self.supported_features,
+            self.state_attributes,
+            self.extra_state_attributes,
+            self.icon,
+            self.name,
+        )
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to Home Assistant unless it is identical to the last write."""
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._last_fingerprint:
+            self._manager.stats["state_writes_suppressed"] += 1
+            return
+        self._last_fingerprint = fingerprint
+        self._manager.stats["state_writes"] += 1
+        super().async_write_ha_state()
+
+    async def async_update(self) -> None:
+        """Refresh the entity before Home Assistant writes its state."""
+        # Home Assistant writes the state itself after an update, bypassing
+        # async_write_ha_state, so the next write must not be suppressed.
+        self._last_fingerprint = None
+        self._async_refresh_from_controller()
+
+    @callback
+    def _async_refresh_from_controller(self) -> None:
+        """Copy the latest device state onto the entity."""
+
+    @callback
+    def _async_set_pending(self, key: str, value, command: str) -> None:
+        """Show value for key until the device reports it, or roll back after a timeout."""
+        if self._pending_commands is None:
+            self._pending_commands = {}
+        if (previous := self._pending_commands.pop(key, None)) is not None:
+            previous.cancel_timeout()
+        elif self._shown_value(key) == value:
+            # Nothing will change, so there is nothing to wait for
+            return
+
+        self._pending_commands[key] = PendingCommand(
+            value,
+            command,
+            time.monotonic(),
+            async_call_later(self.hass, PENDING_COMMAND_TIMEOUT, partial(self._async_pending_expired, key)),
+        )
+
+    def _shown_value(self, key: str):
+        """Return the value key currently has, before a pending command changes it."""
+        return getattr(self, key)
+
+    def _pending_value(self, key: str, reported):
+        """Return the value to show for key, masking what the device reported while a command is pending."""
+        if self._pending_commands and (pending := self._pending_commands.get(key)) is not None:
+            return pending.value
+        return reported
+
+    @callback
+    def _async_resolve_pending(self, key: str, reported):
+        """Confirm a pending command once the device reports its value, return the value to show."""
+        if not self._pending_commands or (pending := self._pending_commands.get(key)) is None:
+            return reported
+        if reported != pending.value:
+            return pending.value
+
+        del self._pending_commands[key]
+        pending.cancel_timeout()
+        self._manager.stats["commands_confirmed"] += 1
+        latency = self._manager.confirm_latency.setdefault(pending.command, LatencyHistogram())
+        latency.record(time.monotonic() - pending.started)
+        return reported
+
+    @callback
+    def _async_pending_expired(self, key: str, _now=None) -> None:
+        """Drop a command the device never confirmed and show what it reports instead."""
+        pending = self._pending_commands.pop(key)
+        self._manager.stats["commands_rolled_back"] += 1
+        _LOGGER.warning(
+            "%s did not confirm %s=%s within %s seconds, showing the reported state again",
+            self.name,
+            pending.command,
+            pending.value,
+            PENDING_COMMAND_TIMEOUT,
+        )
+        self._async_refresh_from_controller()
+        self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the timeouts of commands that are still pending."""
+        for pending in (self._pending_commands or {}).values():
+            pending.cancel_timeout()
+        self._pending_commands = None
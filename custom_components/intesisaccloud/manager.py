@@ -1,43 +1,327 @@
+import asyncio
 import logging
 import random
-from homeassistant.helpers.event import async_call_later
-from pyintesishome import IHConnectionError
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+from itertools import chain
+
+from homeassistant.const import CONF_DEVICE, CONF_HOST, CONF_PASSWORD, CONF_SCAN_INTERVAL, CONF_USERNAME
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util
+from pyintesishome import IHAuthenticationError, IHConnectionError
+
+from .capabilities import PROFILE_KEYS, DeviceCapabilities
+from .commands import (
+    CONF_ACCOUNT_COMMAND_INTERVAL,
+    CONF_DEVICE_COMMAND_INTERVAL,
+    DEFAULT_ACCOUNT_COMMAND_INTERVAL,
+    DEFAULT_DEVICE_COMMAND_INTERVAL,
+    CommandBatcher,
+    RateLimiter,
+)
+from .metrics import LatencyHistogram
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds between fallback polls while the push socket is down
+DEFAULT_SCAN_INTERVAL = 30
+
+# Milliseconds during which controller callbacks are merged into one dispatch
+CONF_COALESCE_WINDOW = "coalesce_window"
+DEFAULT_COALESCE_WINDOW = 100
+
+# Seconds a single listener may spend handling an update before it is abandoned
+LISTENER_TIMEOUT = 5
+
+# Reconnect backoff in seconds, cloud APIs start slower to spread the load
+RECONNECT_BASE_DELAY = 5
+RECONNECT_CLOUD_BASE_DELAY = 10
+RECONNECT_MAX_DELAY = 300
+
+# Number of past outages kept for diagnostics
+RECONNECT_HISTORY = 10
+
+# Limits on connection attempts shared by all config entries
+DEFAULT_MAX_CONCURRENT_CONNECTS = 4
+DEFAULT_HOST_CONNECT_INTERVAL = 2
+
+
+def create_controller(hass, data):
+    """Create the controller for the device type and connection details in data.
+
+    Used by setup and by the config flow, so both talk to the API the same way.
+    """
+    from homeassistant.helpers.aiohttp_client import async_get_clientsession
+    from pyintesishome import IntesisBox, IntesisHome, IntesisHomeLocal
+    from pyintesishome.const import DEVICE_INTESISBOX, DEVICE_INTESISHOME_LOCAL
+
+    device_type = data[CONF_DEVICE]
+    if device_type == DEVICE_INTESISBOX:
+        return IntesisBox(data[CONF_HOST], loop=hass.loop)
+    if device_type == DEVICE_INTESISHOME_LOCAL:
+        return IntesisHomeLocal(
+            data[CONF_HOST],
+            data[CONF_USERNAME],
+            data[CONF_PASSWORD],
+            loop=hass.loop,
+            websession=async_get_clientsession(hass),
+        )
+    return IntesisHome(
+        username=data[CONF_USERNAME],
+        password=data[CONF_PASSWORD],
+        loop=hass.loop,
+        device_type=device_type,
+        websession=async_get_clientsession(hass),
+    )
+
+
+class ConnectLimiter:
+    """Budget for logins shared by every config entry of the integration."""
+
+    def __init__(self, max_concurrent, host_interval):
+        """Initialize the limiter."""
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._host_interval = host_interval
+        self._host_limiters = {}
+
+    @asynccontextmanager
+    async def async_slot(self, host):
+        """Wait until a connection to host may start and hold a slot while it runs."""
+        if (limiter := self._host_limiters.get(host)) is None:
+            limiter = self._host_limiters[host] = RateLimiter(self._host_interval)
+        await limiter.async_wait()
+
+        async with self._semaphore:
+            yield
+
+
 class IntesisManager:
     """Manages the connection to the IntesisHome/Airconwithme API."""
 
-    def __init__(self, hass, controller, config_entry, device_type):
+    def __init__(self, hass, controller, config_entry, device_type, connect_limiter=None, snapshot_store=None):
         """Initialize the manager."""
         self.hass = hass
         self.controller = controller
         self.config_entry = config_entry
         self.device_type = device_type
+        self.connect_limiter = connect_limiter
+        self.snapshot_store = snapshot_store
+        self.startup_timings = {}
         self._connected = False
-        self._update_callbacks = []
+        # Set while entities show the snapshot from the last run, until the first connect
+        self._restored = False
+        # Devices the snapshot seeded into the controller, keyed by device_id
+        self._restored_devices = {}
+        # Capability profiles keyed by device_id
+        self._capabilities = {}
+        self._controller_subscribed = False
+        # Listeners keyed by device_id; None holds the all-devices channel.
+        # Dicts are used as ordered sets so subscribing is O(1).
+        self._listeners = {}
+        self._unsub_poll = None
+        self._unsub_dispatch = None
+        self._pending_updates = set()
+        self._device_states = {}
+        self.coalesce_window = config_entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW) / 1000
+        self.scan_interval = timedelta(seconds=config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
+        self.stats = Counter()
+        self.listener_latency = {}
+        self.dispatch_latency = LatencyHistogram()
+        # Time between consecutive controller callbacks, and when (UTC) each device last called back
+        self.callback_interval = LatencyHistogram()
+        self._last_callback = None
+        self.device_last_update = {}
+        self._reconnect_task = None
+        self._outage_started = None
+        self.current_backoff = None
+        self.reconnect_history = deque(maxlen=RECONNECT_HISTORY)
+        self.time_to_reconnect = LatencyHistogram()
+        self.outage_duration = LatencyHistogram()
+        self._command_batchers = {}
+        self.command_latency = LatencyHistogram()
+        # Seconds the last command batch to each device took
+        self.command_round_trip = {}
+        self.device_command_interval = (
+            config_entry.options.get(CONF_DEVICE_COMMAND_INTERVAL, DEFAULT_DEVICE_COMMAND_INTERVAL) / 1000
+        )
+        account_command_interval = (
+            config_entry.options.get(CONF_ACCOUNT_COMMAND_INTERVAL, DEFAULT_ACCOUNT_COMMAND_INTERVAL) / 1000
+        )
+        # The config flow allows one entry per account, so the entry's limit is the account's
+        self.account_rate_limiter = RateLimiter(account_command_interval)
+        # Time until the device reported the value of a command, per command type
+        self.confirm_latency = {}
+        # Zone switch entities keyed by (device_id, zone_index)
+        self.zone_switches = {}
         from pyintesishome.const import (
-            DEVICE_INTESISHOME,
-            DEVICE_ANYWAIR,
             DEVICE_AIRCONWITHME,
+            DEVICE_ANYWAIR,
+            DEVICE_INTESISHOME,
         )
+
         self.cloud_devices = [DEVICE_INTESISHOME, DEVICE_ANYWAIR, DEVICE_AIRCONWITHME]
 
     def __getattr__(self, name):
         """Delegate undefined attributes to the controller."""
         return getattr(self.controller, name)
 
-    async def async_connect(self):
-        """Connect to the controller."""
-        _LOGGER.debug("Connecting to controller...")
-        await self.controller.connect()
+    @asynccontextmanager
+    async def _async_connect_slot(self):
+        """Hold a slot of the shared login budget, if there is one."""
+        if self.connect_limiter is None:
+            yield
+            return
+
+        # Cloud accounts all log in to the same API, local devices to their own host
+        host = self.config_entry.data.get(CONF_HOST) or self.device_type
+        async with self.connect_limiter.async_slot(host):
+            yield
+
+    async def async_restore(self):
+        """Seed the devices from the last run's snapshot, return if there was one."""
+        if self.snapshot_store is None:
+            return False
+        start = time.monotonic()
+        if (snapshot := await self.snapshot_store.async_load()) is None:
+            return False
+
+        # Entities read the controller, so its device cache holds the last
+        # known state until the first update replaces it.
+        self.controller.get_devices().update(snapshot["devices"])
+        self._restored_devices = snapshot["devices"]
+        self._device_states = {device_id: dict(device) for device_id, device in snapshot["devices"].items()}
+        self._capabilities = {
+            device_id: DeviceCapabilities.from_dict(capabilities)
+            for device_id, capabilities in snapshot["capabilities"].items()
+        }
+        self._restored = True
+        self._async_track_controller()
+        self.startup_timings["restore"] = time.monotonic() - start
+        _LOGGER.debug("Restored %s devices from the snapshot", len(snapshot["devices"]))
+        return True
+
+    async def async_connect_in_background(self):
+        """Connect after entities were created from the snapshot, retrying until it works."""
+        try:
+            await self.async_connect()
+        except IHAuthenticationError as ex:
+            _LOGGER.error("Connecting to %s API failed, credentials were rejected: %s", self.device_type, ex)
+            # The snapshot cannot be trusted without a working login, entities go unavailable
+            self._restored = False
+            self.config_entry.async_start_reauth(self.hass)
+            await self._async_dispatch()
+            return
+        except IHConnectionError as ex:
+            _LOGGER.warning(
+                "Connecting to %s API failed, showing the last known state until it is reachable: %s",
+                self.device_type,
+                ex,
+            )
+            self._async_start_reconnect()
+            return
+        await self._async_dispatch()
+
+    @contextmanager
+    def _restored_devices_removed(self):
+        """Connect without the snapshot's devices, so the controller only holds what the account reports.
+
+        They are put back if connecting fails, entities keep showing them until the next attempt.
+        """
+        devices = self.controller.get_devices()
+        for device_id in self._restored_devices:
+            devices.pop(device_id, None)
+        try:
+            yield
+        except BaseException:
+            for device_id, device in self._restored_devices.items():
+                devices.setdefault(device_id, device)
+            raise
+        self._restored_devices = {}
+
+    async def async_connect(self, already_connected=False):
+        """Connect to the controller, unless it was connected by the config flow."""
+        if not already_connected:
+            _LOGGER.debug("Connecting to controller...")
+            start = time.monotonic()
+            async with self._async_connect_slot():
+                connect_start = time.monotonic()
+                self.startup_timings["connect_wait"] = connect_start - start
+                with self._restored_devices_removed():
+                    await self.controller.connect()
+            # The login and the device download, which happens inside connect
+            self.startup_timings["connect"] = time.monotonic() - connect_start
         self._connected = True
-        self.controller.add_update_callback(self.async_update_callback)
+
+        self._device_states = {device_id: dict(device) for device_id, device in self.controller.get_devices().items()}
+        self._async_snapshot_connected()
+
+        self._async_track_controller()
         _LOGGER.debug("Connection successful. Devices: %s", self.controller.get_devices())
 
+    @callback
+    def _async_track_controller(self):
+        """Listen to the controller, and poll it while its push socket is down."""
+        # Register once, a second registration would deliver every frame twice
+        if not self._controller_subscribed:
+            self.controller.add_update_callback(self.async_update_callback)
+            self._controller_subscribed = True
+
+        # Entities are push driven, so the manager polls on their behalf
+        # only while the socket is down.
+        if self._unsub_poll is None:
+            self._unsub_poll = async_track_time_interval(self.hass, self._async_poll, self.scan_interval)
+
+    @callback
+    def _async_snapshot_connected(self):
+        """Build the capability profiles from the controller and save a new snapshot."""
+        restored_devices = set(self._capabilities) if self._restored else None
+        self._capabilities = {
+            device_id: DeviceCapabilities.from_controller(self.controller, device_id)
+            for device_id in self.controller.get_devices()
+        }
+        self._restored = False
+        self._async_save_snapshot()
+
+        if restored_devices is not None and restored_devices != set(self._capabilities):
+            # Entities were created for the devices of the last run
+            _LOGGER.info("Devices of %s changed since the last run, reloading", self.config_entry.title)
+            self.hass.config_entries.async_schedule_reload(self.config_entry.entry_id)
+
+    @callback
+    def _async_save_snapshot(self):
+        """Schedule writing the snapshot, unless there is no state worth keeping."""
+        if self.snapshot_store is not None and self._connected:
+            self.snapshot_store.async_delay_save(self._snapshot_data)
+
+    def _snapshot_data(self):
+        """Return the snapshot written to storage."""
+        return {
+            "devices": {device_id: dict(device) for device_id, device in self.controller.get_devices().items()},
+            "capabilities": {
+                device_id: capabilities.as_dict() for device_id, capabilities in self._capabilities.items()
+            },
+        }
+
     async def stop(self):
         """Stop the controller."""
-        self.controller.remove_update_callback(self.async_update_callback)
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._unsub_poll:
+            self._unsub_poll()
+            self._unsub_poll = None
+        if self._unsub_dispatch:
+            self._unsub_dispatch()
+            self._unsub_dispatch = None
+        self._pending_updates.clear()
+        for batcher in self._command_batchers.values():
+            batcher.cancel()
+        if self._controller_subscribed:
+            self.controller.remove_update_callback(self.async_update_callback)
+            self._controller_subscribed = False
         await self.controller.stop()
 
     @property
@@ -45,65 +329,295 @@ class IntesisManager:
         """Return if connected."""
         return self._connected
 
+    @property
+    def is_restored(self):
+        """Return if the devices show the last run's state because the API has not answered yet."""
+        return self._restored
+
     def get_devices(self):
         """Get devices from controller."""
         return self.controller.get_devices()
-    
+
     def get_device(self, device_id):
         """Get a specific device."""
         return self.controller.get_device(device_id)
 
+    def get_capabilities(self, device_id):
+        """Return the capability profile of a device.
+
+        Profiles are built on connect, come from the snapshot until then, and
+        are only rebuilt when the model or zone layout of a device changes.
+        """
+        if (capabilities := self._capabilities.get(device_id)) is None:
+            capabilities = self._capabilities[device_id] = DeviceCapabilities.from_controller(
+                self.controller, device_id
+            )
+        return capabilities
+
+    @callback
+    def _async_refresh_capabilities(self, device_id, changed_keys):
+        """Rebuild the profiles of devices whose model or zone layout changed."""
+        if self._restored or (changed_keys is not None and not changed_keys & PROFILE_KEYS):
+            return
+        devices = self.controller.get_devices()
+        device_ids = devices if device_id is None else (device_id,)
+        for device_id in device_ids:
+            capabilities = self._capabilities.get(device_id)
+            if (device := devices.get(device_id)) is None or (
+                capabilities is not None and capabilities.matches(device)
+            ):
+                continue
+            _LOGGER.debug("Rebuilding the capabilities of device %s", device_id)
+            self._capabilities[device_id] = DeviceCapabilities.from_controller(self.controller, device_id)
+
+    def get_device_snapshot(self, device_id):
+        """Return the device state as of the last dispatch, without asking the controller.
+
+        The snapshot is shared by all listeners and must not be modified.
+        """
+        return self._device_states.get(device_id, {})
+
+    async def async_send_commands(self, device_id, commands):
+        """Send commands to a device, merged with any others issued at the same time.
+
+        Commands map what they change, e.g. "setpoint", to the controller
+        method and its arguments after the device id.
+        """
+        if not commands:
+            return
+        if (batcher := self._command_batchers.get(device_id)) is None:
+            batcher = self._command_batchers[device_id] = CommandBatcher(
+                self, device_id, RateLimiter(self.device_command_interval)
+            )
+
+        start = time.monotonic()
+        await batcher.async_send(commands)
+        self.command_round_trip[device_id] = time.monotonic() - start
+        self.command_latency.record(self.command_round_trip[device_id])
+
+    @callback
+    def async_subscribe(self, device_id, method):
+        """Subscribe to updates for a device and return a function to unsubscribe.
+
+        A device_id of None subscribes to the all-devices channel, which only
+        receives broadcasts such as connection state changes.
+        """
+        self._listeners.setdefault(device_id, {})[method] = None
+
+        @callback
+        def unsubscribe():
+            self.async_unsubscribe(device_id, method)
+
+        return unsubscribe
+
+    @callback
+    def async_unsubscribe(self, device_id, method):
+        """Remove a subscription."""
+        if (listeners := self._listeners.get(device_id)) is None:
+            return
+        listeners.pop(method, None)
+        if not listeners:
+            del self._listeners[device_id]
+
+    @property
+    def listener_count(self):
+        """Return the number of active subscriptions."""
+        return sum(len(listeners) for listeners in self._listeners.values())
+
     def add_update_callback(self, method):
-        """Add callback."""
-        if method not in self._update_callbacks:
-            self._update_callbacks.append(method)
+        """Add callback to the all-devices channel."""
+        self.async_subscribe(None, method)
 
     def remove_update_callback(self, method):
-        """Remove callback."""
-        if method in self._update_callbacks:
-            self._update_callbacks.remove(method)
+        """Remove callback from the all-devices channel."""
+        self.async_unsubscribe(None, method)
+
+    def _diff_device(self, device_id):
+        """Return the keys of a device that changed since its last dispatch.
+
+        None means the changes are unknown and listeners should do a full refresh.
+        """
+        device = self.controller.get_device(device_id)
+        previous = self._device_states.pop(device_id, None)
+        if device is None:
+            return None
+
+        self._device_states[device_id] = dict(device)
+        if previous is None:
+            return None
+        return frozenset(key for key in device.keys() | previous.keys() if device.get(key) != previous.get(key))
+
+    async def _async_dispatch(self, device_id=None):
+        """Call the listeners of a device, or every listener for a broadcast."""
+        if device_id is None:
+            listeners = dict.fromkeys(chain.from_iterable(self._listeners.values()))
+            changed_keys = None
+            # Listeners refresh everything, the snapshots follow
+            self._device_states = {
+                device_id: dict(device) for device_id, device in self.controller.get_devices().items()
+            }
+        else:
+            listeners = self._listeners.get(device_id, {}).copy()
+            changed_keys = self._diff_device(device_id)
+            if changed_keys is not None:
+                self.stats["device_keys_changed"] += len(changed_keys)
+        # Listeners read the profile, so it has to be current before they run
+        self._async_refresh_capabilities(device_id, changed_keys)
+
+        # Listeners run concurrently so a slow or failing one cannot hold up
+        # the others or the connection tracking that follows a dispatch.
+        start = time.monotonic()
+        await asyncio.gather(*(self._async_call_listener(method, device_id, changed_keys) for method in listeners))
+        self.dispatch_latency.record(time.monotonic() - start)
+        self._async_save_snapshot()
+
+    async def _async_call_listener(self, method, device_id, changed_keys=None):
+        """Call a single listener, isolating failures and recording its latency."""
+        name = _listener_name(method)
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(LISTENER_TIMEOUT):
+                await method(device_id, changed_keys)
+        except TimeoutError:
+            self.stats["listener_timeouts"] += 1
+            _LOGGER.warning("Listener %s did not handle an update within %i seconds", name, LISTENER_TIMEOUT)
+        except Exception:  # pylint: disable=broad-except
+            self.stats["listener_errors"] += 1
+            _LOGGER.exception("Error in update listener %s", name)
+        finally:
+            if (histogram := self.listener_latency.get(name)) is None:
+                histogram = self.listener_latency[name] = LatencyHistogram()
+            histogram.record(time.monotonic() - start)
+
+    async def _async_poll(self, now=None):
+        """Refresh listeners from the controller if push updates are unavailable."""
+        # The manager's own state, the cloud controller only opens its socket
+        # for the first command so an idle account never reports it connected.
+        if self._connected:
+            self.stats["polls_skipped"] += 1
+            return
+
+        self.stats["polls_performed"] += 1
+        _LOGGER.debug("Push socket to %s is down, polling listeners", self.device_type)
+        await self._async_dispatch()
+
+    async def _async_dispatch_pending(self, now=None):
+        """Propagate the updates collected during the coalescing window to listeners."""
+        self._unsub_dispatch = None
+        pending, self._pending_updates = self._pending_updates, set()
+        if None in pending:
+            # A broadcast refreshes every device, so it supersedes the rest
+            pending = {None}
+
+        for device_id in pending:
+            self.stats["dispatches"] += 1
+            await self._async_dispatch(device_id)
 
     async def async_update_callback(self, device_id=None):
         """Handle updates from the controller."""
-        # Propagate update to listeners
-        for callback in self._update_callbacks:
-            await callback(device_id)
+        self.stats["callbacks_received"] += 1
+        now = time.monotonic()
+        if self._last_callback is not None:
+            self.callback_interval.record(now - self._last_callback)
+        self._last_callback = now
+        if device_id is not None:
+            self.device_last_update[device_id] = dt_util.utcnow()
 
-        # Track changes in connection state
+        # Track changes in connection state first, so listeners see the new
+        # state and every device is refreshed when it changes.
         if self.controller and not self.controller.is_connected and self._connected:
             # Connection has dropped
             self._connected = False
-            reconnect_seconds = 30
-            if self.device_type in self.cloud_devices:
-                # Add a random delay for cloud connections
-                reconnect_seconds = random.randrange(10, 30)
+            _LOGGER.info("Connection to %s API was lost", self.device_type)
+            self._async_start_reconnect()
+            device_id = None
+        elif self.controller.is_connected and not self._connected:
+            _LOGGER.debug("Connection to %s API was restored", self.device_type)
+            self._async_connection_restored()
+            device_id = None
 
-            _LOGGER.info(
-                "Connection to %s API was lost. Reconnecting in %i seconds",
-                self.device_type,
-                reconnect_seconds,
-            )
+        # A single frame can call back several times for the same device,
+        # so updates are merged per device before reaching the listeners.
+        self._pending_updates.add(device_id)
+        if self.coalesce_window <= 0:
+            await self._async_dispatch_pending()
+        elif self._unsub_dispatch is None:
+            self._unsub_dispatch = async_call_later(self.hass, self.coalesce_window, self._async_dispatch_pending)
 
-            async def try_connect(retries):
-                MAX_WAIT_TIME = 300
-                try:
-                    await self.controller.connect()
-                    self._connected = True
-                    _LOGGER.info("Reconnected to %s API", self.device_type)
-                    # Notify listeners of reconnection
-                    for callback in self._update_callbacks:
-                        await callback()
-                except IHConnectionError:
-                    wait_time = min(2**retries, MAX_WAIT_TIME)
-                    _LOGGER.info(
-                        "Failed to reconnect to %s API. Retrying in %i seconds",
-                        self.device_type,
-                        wait_time,
-                    )
-                    async_call_later(self.hass, wait_time, try_connect(retries + 1))
-
-            async_call_later(self.hass, reconnect_seconds, try_connect(0))
-
-        if self.controller.is_connected and not self._connected:
-             self._connected = True
-             _LOGGER.debug("Connection to %s API was restored", self.device_type)
+    @callback
+    def _async_start_reconnect(self):
+        """Start the reconnect supervisor unless it is already running."""
+        if self._outage_started is None:
+            self._outage_started = time.monotonic()
+            self.stats["outages"] += 1
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            return
+        self._reconnect_task = self.config_entry.async_create_background_task(
+            self.hass, self._async_reconnect(), f"intesisaccloud reconnect {self.device_type}"
+        )
+
+    @callback
+    def _async_connection_restored(self, attempts=0):
+        """Record the end of an outage and stop the supervisor."""
+        self._connected = True
+        self.current_backoff = None
+        if self._restored:
+            self._async_snapshot_connected()
+        if self._reconnect_task is not None and self._reconnect_task is not asyncio.current_task():
+            self._reconnect_task.cancel()
+        self._reconnect_task = None
+        if self._outage_started is None:
+            return
+
+        duration = time.monotonic() - self._outage_started
+        self._outage_started = None
+        self.outage_duration.record(duration)
+        self.reconnect_history.append(
+            {
+                "restored": dt_util.utcnow().isoformat(),
+                "outage_seconds": round(duration, 1),
+                "attempts": attempts,
+            }
+        )
+
+    async def _async_reconnect(self):
+        """Reconnect with full-jitter exponential backoff, one attempt at a time."""
+        base_delay = RECONNECT_CLOUD_BASE_DELAY if self.device_type in self.cloud_devices else RECONNECT_BASE_DELAY
+        attempt = 0
+        while True:
+            self.current_backoff = random.uniform(0, min(RECONNECT_MAX_DELAY, base_delay * 2**attempt))
+            _LOGGER.info("Reconnecting to %s API in %i seconds", self.device_type, self.current_backoff)
+            await asyncio.sleep(self.current_backoff)
+
+            attempt += 1
+            self.stats["reconnect_attempts"] += 1
+            try:
+                async with self._async_connect_slot():
+                    with self._restored_devices_removed():
+                        await self.controller.connect()
+            except IHAuthenticationError as ex:
+                _LOGGER.error("Reconnecting to %s API failed, credentials were rejected: %s", self.device_type, ex)
+                self.current_backoff = None
+                return
+            except IHConnectionError as ex:
+                self.stats["reconnect_failures"] += 1
+                _LOGGER.info("Failed to reconnect to %s API: %s", self.device_type, ex)
+                continue
+            except Exception:  # pylint: disable=broad-except
+                self.stats["reconnect_failures"] += 1
+                _LOGGER.exception("Unexpected error reconnecting to %s API", self.device_type)
+                continue
+            break
+
+        _LOGGER.info("Reconnected to %s API after %i attempts", self.device_type, attempt)
+        if self._outage_started is not None:
+            self.time_to_reconnect.record(time.monotonic() - self._outage_started)
+        self._async_connection_restored(attempt)
+        # Notify listeners of reconnection
+        await self._async_dispatch()
+
+
+def _listener_name(method):
+    """Return a readable name for a listener, preferring the entity id of its owner."""
+    owner = getattr(method, "__self__", None)
+    return getattr(owner, "entity_id", None) or getattr(method, "__qualname__", repr(method))
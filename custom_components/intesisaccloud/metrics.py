@@ -0,0 +1,53 @@
+"""Lightweight performance counters for the IntesisACCloud integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+
+# Upper bounds of the latency buckets in milliseconds, the last bucket is open ended
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram that is cheap enough to update on every call."""
+
+    __slots__ = ("buckets", "count", "total", "maximum")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a single duration."""
+        milliseconds = seconds * 1000
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.maximum = max(self.maximum, milliseconds)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return an upper bound in milliseconds for the given percentile, from the buckets."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        # The open ended bucket has no bound, it is covered by the maximum below
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets[:-1], strict=True):
+            seen += count
+            if seen >= rank:
+                return min(bound, round(self.maximum, 2))
+        return round(self.maximum, 2)
+
+    def as_dict(self) -> dict:
+        """Return the histogram in a JSON serialisable form."""
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS]
+        labels.append(f">{LATENCY_BUCKETS_MS[-1]}ms")
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "max_ms": round(self.maximum, 2),
+            "buckets": dict(zip(labels, self.buckets, strict=True)),
+        }
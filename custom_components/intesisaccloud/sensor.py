@@ -0,0 +1,270 @@
+"""Support for IntesisACCloud sensors."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import DOMAIN
+from .entity import IntesisEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _outdoor_temperature(manager, device_id: str, state: dict) -> float | None:
+    """Return the outdoor temperature, converted from the raw value by the controller."""
+    return manager.controller.get_outdoor_temperature(device_id)
+
+
+def _power(key: str) -> Callable[[Any, str, dict], int | None]:
+    """Return a reader for a power consumption in watts."""
+
+    def read(manager, device_id: str, state: dict) -> int | None:
+        if value := state.get(key):
+            return int(value)
+        return None
+
+    return read
+
+
+def _command_round_trip(manager, device_id: str, state: dict) -> float | None:
+    """Return the time the last command batch took in milliseconds."""
+    if (seconds := manager.command_round_trip.get(device_id)) is None:
+        return None
+    return round(seconds * 1000)
+
+
+@dataclass(frozen=True, kw_only=True)
+class IntesisSensorEntityDescription(SensorEntityDescription):
+    """Describes an IntesisACCloud sensor."""
+
+    # Reads the value, from the manager's snapshot of the device or a controller accessor
+    value_fn: Callable[[Any, str, dict], Any]
+    # Device keys the value depends on, None when it may change on any update
+    keys: frozenset[str] | None = None
+    # Only created when the device reports one of the keys
+    requires_keys: bool = True
+
+
+SENSOR_DESCRIPTIONS: tuple[IntesisSensorEntityDescription, ...] = (
+    IntesisSensorEntityDescription(
+        key="rssi",
+        name="RSSI",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda manager, device_id, state: state.get("rssi"),
+        keys=frozenset({"rssi"}),
+    ),
+    IntesisSensorEntityDescription(
+        key="run_hours",
+        name="Run hours",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda manager, device_id, state: state.get("working_hours"),
+        keys=frozenset({"working_hours"}),
+    ),
+    IntesisSensorEntityDescription(
+        key="outdoor_temperature",
+        name="Outdoor temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=_outdoor_temperature,
+        keys=frozenset({"outdoor_temp"}),
+    ),
+    IntesisSensorEntityDescription(
+        key="power_consumption_heat",
+        name="Heating power",
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        value_fn=_power("aquarea_heat_consumption"),
+        keys=frozenset({"aquarea_heat_consumption"}),
+    ),
+    IntesisSensorEntityDescription(
+        key="power_consumption_cool",
+        name="Cooling power",
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        value_fn=_power("aquarea_cool_consumption"),
+        keys=frozenset({"aquarea_cool_consumption"}),
+    ),
+    IntesisSensorEntityDescription(
+        key="last_update",
+        name="Last update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        # Changes with every push, so it is opt-in to keep the recorder quiet
+        entity_registry_enabled_default=False,
+        value_fn=lambda manager, device_id, state: manager.device_last_update.get(device_id),
+        requires_keys=False,
+    ),
+    IntesisSensorEntityDescription(
+        key="command_round_trip",
+        name="Command round trip",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=_command_round_trip,
+        requires_keys=False,
+    ),
+)
+
+# Energy sensors integrate the power readings their value_fn returns
+ENERGY_SENSOR_DESCRIPTIONS: tuple[IntesisSensorEntityDescription, ...] = (
+    IntesisSensorEntityDescription(
+        key="energy_heat",
+        name="Heating energy",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        suggested_display_precision=2,
+        value_fn=_power("aquarea_heat_consumption"),
+        keys=frozenset({"aquarea_heat_consumption"}),
+    ),
+    IntesisSensorEntityDescription(
+        key="energy_cool",
+        name="Cooling energy",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        suggested_display_precision=2,
+        value_fn=_power("aquarea_cool_consumption"),
+        keys=frozenset({"aquarea_cool_consumption"}),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up IntesisACCloud sensor entities."""
+    manager = hass.data[DOMAIN]["controller"][config_entry.entry_id]
+    entities = []
+    for device_id, device in manager.get_devices().items():
+        entities.extend(
+            IntesisSensor(manager, device_id, device.get("name"), description)
+            for description in SENSOR_DESCRIPTIONS
+            if not description.requires_keys or not description.keys.isdisjoint(device)
+        )
+        entities.extend(
+            IntesisEnergySensor(manager, device_id, device.get("name"), description)
+            for description in ENERGY_SENSOR_DESCRIPTIONS
+            if not description.keys.isdisjoint(device)
+        )
+    _LOGGER.debug("Adding %s sensors", len(entities))
+    if entities:
+        async_add_entities(entities)
+
+
+class IntesisSensor(IntesisEntity, SensorEntity):
+    """Sensor fed from the manager's snapshot of a device."""
+
+    entity_description: IntesisSensorEntityDescription
+
+    def __init__(self, manager, device_id: str, device_name: str, description: IntesisSensorEntityDescription) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._manager = manager
+        self._device_id = device_id
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_unique_id = f"{device_id}_{description.key}"
+        self._async_refresh_from_controller()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to updates for the device."""
+        self.async_on_remove(self._manager.async_subscribe(self._device_id, self.async_update_callback))
+
+    @property
+    def available(self) -> bool:
+        """Return if the manager is connected, or shows the last run's state."""
+        return self._manager.is_connected or self._manager.is_restored
+
+    @callback
+    def _async_refresh_from_controller(self) -> None:
+        """Read the value from the manager's snapshot, raw values are converted by the controller."""
+        self._attr_native_value = self.entity_description.value_fn(
+            self._manager, self._device_id, self._manager.get_device_snapshot(self._device_id)
+        )
+
+    async def async_update_callback(
+        self, device_id: str | None = None, changed_keys: frozenset[str] | None = None
+    ) -> None:
+        """Update the sensor when a key it depends on changed."""
+        keys = self.entity_description.keys
+        if changed_keys is not None and keys is not None and keys.isdisjoint(changed_keys):
+            return
+        self._async_refresh_from_controller()
+        self.async_write_ha_state()
+
+
+class IntesisEnergySensor(IntesisSensor, RestoreSensor):
+    """Energy accumulated from the power readings a device pushes."""
+
+    def __init__(self, manager, device_id: str, device_name: str, description: IntesisSensorEntityDescription) -> None:
+        """Initialize the sensor."""
+        self._energy = 0.0
+        self._power = None
+        self._power_since = None
+        super().__init__(manager, device_id, device_name, description)
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the energy accumulated before the last restart."""
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_sensor_data()) is not None and last.native_value is not None:
+            self._energy = float(last.native_value) + self._energy
+            self._attr_native_value = round(self._energy, 3)
+
+    @callback
+    def _async_refresh_from_controller(self) -> None:
+        """Add the energy used since the previous update."""
+        now = time.monotonic()
+        if self._power is not None:
+            # Power is pushed when it changes, so it held its previous value
+            # for the whole interval and a step integral is exact.
+            self._energy += self._power * (now - self._power_since) / 3_600_000
+
+        self._power = None
+        if self._manager.is_connected:
+            self._power = self.entity_description.value_fn(
+                self._manager, self._device_id, self._manager.get_device_snapshot(self._device_id)
+            )
+        self._power_since = now
+        self._attr_native_value = round(self._energy, 3)
+
+    async def async_update_callback(
+        self, device_id: str | None = None, changed_keys: frozenset[str] | None = None
+    ) -> None:
+        """Accumulate on every update of the device so the total keeps moving."""
+        self._async_refresh_from_controller()
+        self.async_write_ha_state()
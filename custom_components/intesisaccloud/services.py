@@ -0,0 +1,74 @@
+"""Services for the IntesisACCloud integration."""
+
+from __future__ import annotations
+
+import logging
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+
+from .capabilities import ZONE_ON_STATES, ZONE_SPILL_STATES, zone_keys
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_ZONES = "set_zones"
+ATTR_DEVICE = "device"
+ATTR_ZONES = "zones"
+
+SET_ZONES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE): cv.string,
+        vol.Required(ATTR_ZONES): vol.All({vol.All(vol.Coerce(int), vol.Range(min=1)): cv.boolean}, vol.Length(min=1)),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant, domain: str) -> None:
+    """Register the integration's services."""
+
+    async def async_set_zones(call: ServiceCall) -> None:
+        """Switch several zones of a device with one batch of commands."""
+        device_id = call.data[ATTR_DEVICE]
+        manager = next(
+            (
+                manager
+                for manager in hass.data[domain].get("controller", {}).values()
+                if device_id in manager.get_devices()
+            ),
+            None,
+        )
+        if manager is None:
+            raise ServiceValidationError(f"Unknown IntesisACCloud device: {device_id}")
+
+        device = manager.get_devices()[device_id]
+        number_of_zones = manager.get_capabilities(device_id).zones
+        changes = {}
+        for zone_index, is_on in call.data[ATTR_ZONES].items():
+            if zone_index > number_of_zones:
+                raise ServiceValidationError(
+                    f"Zone {zone_index} does not exist on {device_id}, it has {number_of_zones} zones"
+                )
+            status = device.get(zone_keys(zone_index)[0])
+            if status in ZONE_SPILL_STATES:
+                raise ServiceValidationError(f"Zone {zone_index} of {device_id} is a spill zone and cannot be switched")
+            if (status in ZONE_ON_STATES) == is_on:
+                manager.stats["zone_commands_skipped"] += 1
+                continue
+            changes[zone_index] = is_on
+
+        _LOGGER.debug("Setting zones of %s: %s", device_id, changes)
+        await manager.async_send_commands(
+            device_id,
+            {
+                zone_keys(zone_index)[1]: ("set_zone_status", zone_index, "on" if is_on else "off")
+                for zone_index, is_on in changes.items()
+            },
+        )
+
+        for zone_index, is_on in changes.items():
+            if switch := manager.zone_switches.get((device_id, zone_index)):
+                switch.async_set_requested_state(is_on)
+
+    hass.services.async_register(domain, SERVICE_SET_ZONES, async_set_zones, schema=SET_ZONES_SCHEMA)
@@ -0,0 +1,57 @@
+"""Persisted snapshot of the devices of a config entry, used to start before the API answers."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_KEY = "intesisaccloud.snapshot"
+
+# Seconds state changes are collected before the snapshot is written
+SNAPSHOT_SAVE_DELAY = 60
+
+
+def _restore_keys(value: Any) -> Any:
+    """Turn the keys JSON made strings of back into integers, e.g. in config_fan_map."""
+    if isinstance(value, dict):
+        return {
+            int(key) if isinstance(key, str) and key.lstrip("-").isdigit() else key: _restore_keys(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_restore_keys(item) for item in value]
+    return value
+
+
+class DeviceSnapshotStore:
+    """Stores the device list, capabilities and last state of one config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(hass, SNAPSHOT_VERSION, f"{SNAPSHOT_KEY}.{entry_id}")
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Return the snapshot, or None if there is none that can be used."""
+        data = await self._store.async_load()
+        if not data or not data.get("devices"):
+            return None
+        return {
+            # Device keys are names, only values nested in them may have had integer keys
+            "devices": {
+                device_id: {key: _restore_keys(value) for key, value in device.items()}
+                for device_id, device in data["devices"].items()
+            },
+            "capabilities": data.get("capabilities", {}),
+        }
+
+    def async_delay_save(self, data_func: Callable[[], dict[str, Any]]) -> None:
+        """Write the snapshot once changes have settled, and when Home Assistant stops."""
+        self._store.async_delay_save(data_func, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the snapshot."""
+        await self._store.async_remove()
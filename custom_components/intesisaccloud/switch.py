@@ -1,4 +1,5 @@
 """Support for IntesisACCloud Zone Switches."""
+
 from __future__ import annotations
 
 import logging
@@ -6,14 +7,20 @@ from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from pyintesishome import IntesisBase
 
 from . import DOMAIN
+from .capabilities import ZONE_ON_STATES, ZONE_SPILL_STATES, ZONE_STATUS_PREFIX, zone_keys
+from .entity import IntesisEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Device key whose change means zones may have been added or removed
+ZONE_LAYOUT_KEY = "number_of_zones"
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -21,45 +28,94 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up IntesisACCloud switch entities."""
-    controller = hass.data[DOMAIN]["controller"][config_entry.unique_id]
+    controller = hass.data[DOMAIN]["controller"][config_entry.entry_id]
     ih_devices = controller.get_devices()
     _LOGGER.debug("Found %s devices", len(ih_devices))
-    entities = []
 
-    for ih_device_id, device in ih_devices.items():
-        # Zone Discovery
-        number_of_zones = device.get("number_of_zones", 0)
+    discovery = ZoneDiscovery(hass, controller, async_add_entities)
+    discovery.async_scan(ih_devices)
 
-        if number_of_zones > 0:
-            _LOGGER.debug(
-                "Device %s has %s zones. Discovering...", ih_device_id, number_of_zones
-            )
-        else:
-            _LOGGER.debug(
-                "Device %s reports 0 zones. Full device data: %s", ih_device_id, device
-            )
+    # Zones are added and removed as the devices report them, without a reload
+    for ih_device_id in (*ih_devices, None):
+        config_entry.async_on_unload(controller.async_subscribe(ih_device_id, discovery.async_update_callback))
 
-        zone_friendly_index = 1
-        for zone_index in range(1, number_of_zones + 1):
-            # Check initial status
-            zone_status = device.get(f"zone_status_{zone_index}")
 
-            _LOGGER.debug("Zone %s status: %s", zone_index, zone_status)
+def _zone_indexes(device: dict, number_of_zones: int) -> set[int]:
+    """Return the zones of a device that should have a switch."""
+    zones = set()
+    for zone_index in range(1, number_of_zones + 1):
+        # Spill zones are opened by the unit itself and cannot be switched
+        if device.get(zone_keys(zone_index)[0]) in ZONE_SPILL_STATES:
+            continue
+        zones.add(zone_index)
+    return zones
 
-            # Filter out spill zones (7)
-            if zone_status == 7 or zone_status == 'spill':
-                _LOGGER.debug("Skipping spill zone %s for device %s", zone_index, ih_device_id)
-                continue
 
-            # Add entity for valid zone
-            entities.append(IntesisZoneSwitch(controller, ih_device_id, zone_index, zone_friendly_index))
-            zone_friendly_index += 1
+class ZoneDiscovery:
+    """Keeps one switch per switchable zone as zones appear, spill or go away."""
 
-    if entities:
-        async_add_entities(entities)
+    def __init__(self, hass: HomeAssistant, manager, async_add_entities: AddEntitiesCallback) -> None:
+        """Initialize zone discovery."""
+        self._hass = hass
+        self._manager = manager
+        self._async_add_entities = async_add_entities
+        # Switches keyed by device_id, then zone_index
+        self.switches: dict[str, dict[int, IntesisZoneSwitch]] = {}
+
+    @callback
+    def async_scan(self, device_ids) -> list[IntesisZoneSwitch]:
+        """Add switches for new zones and return those whose zone is gone or spilling."""
+        devices = self._manager.get_devices()
+        added = []
+        removed = []
+        for device_id in device_ids:
+            device = devices.get(device_id)
+            # The zone count comes from the device's capability profile
+            wanted = _zone_indexes(device, self._manager.get_capabilities(device_id).zones) if device else set()
+            switches = self.switches.setdefault(device_id, {})
+            if device and wanted != switches.keys():
+                _LOGGER.debug("Device %s has %s switchable zones: %s", device_id, len(wanted), sorted(wanted))
+
+            for zone_index in sorted(wanted - switches.keys()):
+                switches[zone_index] = IntesisZoneSwitch(self._manager, device_id, zone_index, zone_index)
+                added.append(switches[zone_index])
+            for zone_index in switches.keys() - wanted:
+                removed.append(switches.pop(zone_index))
+
+        if added:
+            self._async_add_entities(added)
+        return removed
+
+    async def async_update_callback(
+        self, device_id: str | None = None, changed_keys: frozenset[str] | None = None
+    ) -> None:
+        """Rescan the zones of a device when its zone count or a zone status changed."""
+        if changed_keys is not None and not any(
+            key == ZONE_LAYOUT_KEY or key.startswith(ZONE_STATUS_PREFIX) for key in changed_keys
+        ):
+            return
+
+        device_ids = self._manager.get_devices() if device_id is None else (device_id,)
+        for switch in self.async_scan(device_ids):
+            await self._async_remove_switch(switch)
+
+    async def _async_remove_switch(self, switch: IntesisZoneSwitch) -> None:
+        """Remove the switch of a zone that went away or started to spill."""
+        device = self._manager.get_devices().get(switch.device_id)
+        if device and switch.zone_index <= self._manager.get_capabilities(switch.device_id).zones:
+            # A spilling zone keeps its registry entry for when it comes back
+            _LOGGER.debug("Zone %s of device %s is spilling", switch.zone_index, switch.device_id)
+            await switch.async_remove()
+            return
+
+        _LOGGER.debug("Zone %s of device %s was removed", switch.zone_index, switch.device_id)
+        if switch.registry_entry:
+            er.async_get(self._hass).async_remove(switch.entity_id)
+        else:
+            await switch.async_remove()
 
 
-class IntesisZoneSwitch(SwitchEntity):
+class IntesisZoneSwitch(IntesisEntity, SwitchEntity):
     """Representation of an IntesisACCloud Zone Switch."""
 
     def __init__(self, manager, device_id: str, zone_index: int, zone_friendly_index: int) -> None:
@@ -68,49 +124,78 @@ class IntesisZoneSwitch(SwitchEntity):
         self._controller: IntesisBase = manager.controller
         self._device_id = device_id
         self._zone_index = zone_index
-        self._zone_friendly_index = zone_friendly_index
-        self._device_name = self._controller.get_devices()[device_id].get("name")
-        self._attr_name = f"{self._device_name} Zone {zone_friendly_index}"
+        # Keys are resolved once and shared by the zones of every device
+        self._status_key, self._command_key = zone_keys(zone_index)
+        self._zone_on = self._read_zone_on()
+        device = self._controller.get_devices().get(device_id) or {}
+        self._attr_name = f"{device.get('name')} Zone {zone_friendly_index}"
         self._attr_unique_id = f"{device_id}_zone_{zone_index}"
 
+    @property
+    def device_id(self) -> str:
+        """Return the id of the device the zone belongs to."""
+        return self._device_id
+
+    @property
+    def zone_index(self) -> int:
+        """Return the zone number on the device."""
+        return self._zone_index
+
     @property
     def is_on(self) -> bool | None:
         """Return True if zone is on."""
-        devices = self._controller.get_devices()
-        if self._device_id not in devices:
-            return None
-
-        state = devices[self._device_id].get(f"zone_status_{self._zone_index}")
+        return self._pending_value("is_on", self._zone_on)
 
-        # 1 = On, 7 = Spill (but spill shouldn't be here if we filtered correctly,
-        # unless it changed state dynamically to spill)
-        # If it changes to spill dynamically, it should technically be ON?
-        # User said: "Check number of zones... if status is spill... just don't create entity"
-        # Implies static check? Or dynamic?
-        # "zone_status" updates dynamically.
-        # If it becomes spill later, we probably should report it as ON if we already have the entity.
-        # But 'spill' implies it's open for safety. So ON is correct.
-        return state in [1, 7, 'on', 'spill']
+    def _read_zone_on(self) -> bool | None:
+        """Return whether the device reports the zone as on."""
+        # Controllers replace the device dictionaries on polls and reconnects,
+        # so the device is looked up every time rather than kept.
+        if (device := self._controller.get_devices().get(self._device_id)) is None:
+            return None
+        # Zone discovery removes the switch of a zone that starts to spill
+        return device.get(self._status_key) in ZONE_ON_STATES
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the zone on."""
-        await self._controller.set_zone_status(self._device_id, self._zone_index, 'on')
-        self.async_write_ha_state()
+        await self._manager.async_send_commands(
+            self._device_id, {self._command_key: ("set_zone_status", self._zone_index, "on")}
+        )
+        self.async_set_requested_state(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the zone off."""
-        await self._controller.set_zone_status(self._device_id, self._zone_index, 'off')
+        await self._manager.async_send_commands(
+            self._device_id, {self._command_key: ("set_zone_status", self._zone_index, "off")}
+        )
+        self.async_set_requested_state(False)
+
+    @callback
+    def async_set_requested_state(self, is_on: bool) -> None:
+        """Show a state that was sent to the zone until the device confirms it."""
+        self._async_set_pending("is_on", is_on, "zone")
         self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
-        """Subscribe to updates."""
-        self._manager.add_update_callback(self.async_update_callback)
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Unsubscribe from updates."""
-        self._manager.remove_update_callback(self.async_update_callback)
-
-    async def async_update_callback(self, device_id: str | None = None) -> None:
+        """Subscribe to updates for the parent device."""
+        self.async_on_remove(self._manager.async_subscribe(self._device_id, self.async_update_callback))
+        # Lets the set_zones service update every switch it touched at once
+        key = (self._device_id, self._zone_index)
+        self._manager.zone_switches[key] = self
+        self.async_on_remove(lambda: self._manager.zone_switches.pop(key, None))
+
+    @callback
+    def _async_refresh_from_controller(self) -> None:
+        """Read the zone status."""
+        self._zone_on = self._read_zone_on()
+        self._async_resolve_pending("is_on", self._zone_on)
+
+    async def async_update_callback(
+        self, device_id: str | None = None, changed_keys: frozenset[str] | None = None
+    ) -> None:
         """Update the entity's state."""
-        if not device_id or self._device_id == device_id:
-            self.async_schedule_update_ha_state(True)
+        if changed_keys is None or ZONE_LAYOUT_KEY in changed_keys or self._status_key in changed_keys:
+            self._async_refresh_from_controller()
+        else:
+            # Nothing this zone shows has changed
+            return
+        self.async_write_ha_state()
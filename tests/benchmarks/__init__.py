@@ -0,0 +1 @@
+"""Performance benchmarks of the integration, run with ``pytest -m benchmark``."""
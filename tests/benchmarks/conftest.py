@@ -0,0 +1,89 @@
+"""Fixtures for the benchmark suite.
+
+The benchmarks drive the real manager and platforms from a fake cloud
+controller holding any number of devices and zones. They are excluded from
+the default test run, select them with ``pytest -m benchmark``. Sizes can be
+changed through the environment:
+
+- ``INTESIS_BENCHMARK_DEVICES``: devices on the fake account (200)
+- ``INTESIS_BENCHMARK_ZONES``: zones per device (8)
+- ``INTESIS_BENCHMARK_FRAMES``: push frames per run (200)
+- ``INTESIS_BENCHMARK_DEVICES_PER_FRAME``: devices changed by each frame (10)
+- ``INTESIS_BENCHMARK_RATE``: push frames per second, 0 pushes as fast as possible (0)
+"""
+
+import asyncio
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+from homeassistant.helpers.entity import Entity
+
+from custom_components.intesisaccloud import DOMAIN
+from custom_components.intesisaccloud.manager import IntesisManager
+
+from .fake_account import BENCHMARK_DEVICES, BENCHMARK_ZONES, FakeController
+
+_RESULTS = []
+
+
+def pytest_collection_modifyitems(items):
+    """Mark everything in this directory as a benchmark."""
+    for item in items:
+        if "benchmarks" in item.nodeid:
+            item.add_marker(pytest.mark.benchmark)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the results collected by the benchmarks."""
+    if not _RESULTS:
+        return
+    terminalreporter.section("intesisaccloud benchmarks")
+    for name, results in _RESULTS:
+        terminalreporter.write_line(name)
+        for metric, value in results.items():
+            terminalreporter.write_line(f"  {metric:<32} {value}")
+
+
+@pytest.fixture
+def benchmark_report(request):
+    """Return a function recording the results of the current benchmark."""
+
+    def report(**results):
+        _RESULTS.append((request.node.name, results))
+
+    return report
+
+
+@pytest.fixture
+async def fake_controller():
+    """Fake controller with the benchmark's number of devices and zones."""
+    return FakeController(BENCHMARK_DEVICES, BENCHMARK_ZONES)
+
+
+@pytest.fixture
+def state_writes():
+    """Count the state writes that reach Home Assistant."""
+    writes = Counter()
+
+    def write(entity):
+        writes[type(entity).__name__] += 1
+
+    with patch.object(Entity, "async_write_ha_state", write):
+        yield writes
+
+
+@pytest.fixture
+async def benchmark_manager(hass, config_entry, fake_controller):
+    """Connected manager whose coalescing window is ended by the benchmark."""
+    config_entry.async_create_background_task.side_effect = lambda hass, coro, name: (
+        asyncio.get_running_loop().create_task(coro)
+    )
+    manager = IntesisManager(hass, fake_controller, config_entry, "IntesisHome")
+    with (
+        patch("custom_components.intesisaccloud.manager.async_call_later"),
+        patch("custom_components.intesisaccloud.manager.async_track_time_interval"),
+    ):
+        await manager.async_connect()
+        hass.data[DOMAIN]["controller"] = {config_entry.entry_id: manager}
+        yield manager
@@ -0,0 +1,124 @@
+"""A fake cloud account for the benchmarks, with any number of devices and zones."""
+
+import asyncio
+import os
+import random
+import time
+from unittest.mock import MagicMock, patch
+
+from homeassistant.components.sensor import RestoreSensor
+from homeassistant.helpers.entity import Entity
+from pyintesishome import IntesisHome
+
+from custom_components.intesisaccloud.metrics import LatencyHistogram
+
+BENCHMARK_DEVICES = int(os.environ.get("INTESIS_BENCHMARK_DEVICES", 200))
+BENCHMARK_ZONES = int(os.environ.get("INTESIS_BENCHMARK_ZONES", 8))
+BENCHMARK_FRAMES = int(os.environ.get("INTESIS_BENCHMARK_FRAMES", 200))
+BENCHMARK_DEVICES_PER_FRAME = int(os.environ.get("INTESIS_BENCHMARK_DEVICES_PER_FRAME", 10))
+BENCHMARK_RATE = float(os.environ.get("INTESIS_BENCHMARK_RATE", 0))
+
+# Seconds between the ticks used to measure event loop lag
+LOOP_LAG_INTERVAL = 0.005
+
+
+class FakeController(IntesisHome):
+    """Cloud controller whose devices live in memory and push on demand."""
+
+    def __init__(self, device_count: int, zone_count: int) -> None:
+        """Initialize the controller with a generated account."""
+        super().__init__("benchmark", "benchmark", websession=MagicMock(), use_socket=False, poll_interval=0)
+        self._random = random.Random(0)
+        for index in range(device_count):
+            device = {
+                "name": f"Unit {index}",
+                "power": "on",
+                "mode": "cool",
+                "setpoint": 220,
+                "setpoint_min": 160,
+                "setpoint_max": 300,
+                "temperature": 215,
+                "outdoor_temp": 180,
+                "fan_speed": 1,
+                "vvane": "auto/stop",
+                "climate_working_mode": "comfort",
+                "rssi": -60,
+                "working_hours": 1200,
+                "aquarea_cool_consumption": 800,
+                "config_mode_map": 31,
+                "config_fan_map": {0: "auto", 1: "quiet", 2: "low", 3: "medium", 4: "high"},
+                "config_vertical_vanes": 1536,
+                "number_of_zones": zone_count,
+            }
+            for zone_index in range(1, zone_count + 1):
+                device[f"zone_status_{zone_index}"] = zone_index % 2
+            self._devices[str(index)] = device
+
+    async def connect(self):
+        """Pretend to log in and open the push socket."""
+        self._connected = True
+
+    async def stop(self):
+        """Pretend to close the push socket."""
+        self._connected = False
+
+    async def async_push_frame(self, devices_per_frame: int) -> int:
+        """Push one frame changing a few keys of random devices, return the callbacks made.
+
+        Each changed key calls back separately, as status frames do.
+        """
+        callbacks = 0
+        for device_id in self._random.sample(sorted(self._devices), devices_per_frame):
+            device = self._devices[device_id]
+            device["temperature"] = 180 + self._random.randrange(80)
+            device["rssi"] = -40 - self._random.randrange(40)
+            zone = f"zone_status_{self._random.randint(1, device['number_of_zones'])}"
+            if zone in device:
+                device[zone] = 1 - device[zone]
+            for _ in range(3):
+                await self._send_update_callback(device_id=device_id)
+                callbacks += 1
+        return callbacks
+
+
+class EventLoopLag:
+    """Measures how late a periodic tick wakes up while the loop is busy."""
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.histogram = LatencyHistogram()
+        self._task = None
+
+    async def _async_tick(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            self.histogram.record(max(0.0, time.monotonic() - start - LOOP_LAG_INTERVAL))
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._async_tick())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._task.cancel()
+
+
+async def async_setup_platform(hass, config_entry, platform) -> list[Entity]:
+    """Set up one platform and add its entities the way Home Assistant would."""
+    batches = []
+    await platform.async_setup_entry(
+        hass, config_entry, lambda entities, update_before_add=False: batches.append((entities, update_before_add))
+    )
+
+    added = []
+    domain = platform.__name__.rsplit(".", 1)[-1]
+    for entities, update_before_add in batches:
+        for entity in entities:
+            entity.hass = hass
+            entity.entity_id = f"{domain}.{entity.unique_id}"
+            if update_before_add:
+                await entity.async_update()
+            with patch.object(RestoreSensor, "async_get_last_sensor_data", return_value=None):
+                await entity.async_added_to_hass()
+            added.append(entity)
+    return added
@@ -0,0 +1,31 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from custom_components.intesisaccloud import climate, sensor, switch
+
+from .fake_account import async_setup_platform
+
+
+@pytest.mark.parametrize("platform", [climate, sensor, switch], ids=["climate", "sensor", "switch"])
+async def test_memory_per_entity(hass, config_entry, benchmark_manager, state_writes, benchmark_report, platform):
+    """Measure the memory each entity of a platform holds once it is added."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        entities = await async_setup_platform(hass, config_entry, platform)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    benchmark_report(
+        entities=len(entities),
+        bytes_per_entity=round(allocated / len(entities)),
+        # Instance attributes live in a dict per entity, state kept in slots does not
+        attributes_per_entity=round(sum(len(vars(entity)) for entity in entities) / len(entities)),
+    )
+    assert entities
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from custom_components.intesisaccloud import climate, sensor, switch
+from custom_components.intesisaccloud.climate import IntesisAC
+
+from .fake_account import (
+    BENCHMARK_DEVICES_PER_FRAME,
+    BENCHMARK_FRAMES,
+    BENCHMARK_RATE,
+    EventLoopLag,
+    async_setup_platform,
+)
+
+
+def _listener_calls(manager):
+    return sum(histogram.count for histogram in manager.listener_latency.values())
+
+
+async def _async_setup_all(hass, config_entry):
+    entities = []
+    for platform in (climate, sensor, switch):
+        entities.extend(await async_setup_platform(hass, config_entry, platform))
+    return entities
+
+
+async def test_push_frames(hass, config_entry, fake_controller, benchmark_manager, state_writes, benchmark_report):
+    """Push status frames for a few devices at a time through every platform."""
+    entities = await _async_setup_all(hass, config_entry)
+    manager = benchmark_manager
+    state_writes.clear()
+    listener_calls = _listener_calls(manager)
+    dispatches = manager.stats["dispatches"]
+    callbacks = 0
+
+    with patch.object(IntesisAC, "async_update", autospec=True, wraps=IntesisAC.async_update) as mock_update:
+        with EventLoopLag() as lag:
+            start = time.monotonic()
+            for _ in range(BENCHMARK_FRAMES):
+                callbacks += await fake_controller.async_push_frame(BENCHMARK_DEVICES_PER_FRAME)
+                # The coalescing window ends after the frame
+                await manager._async_dispatch_pending()
+                await asyncio.sleep(1 / BENCHMARK_RATE if BENCHMARK_RATE else 0)
+            elapsed = time.monotonic() - start
+
+    writes = sum(state_writes.values())
+    benchmark_report(
+        entities=len(entities),
+        frames=BENCHMARK_FRAMES,
+        callbacks_per_second=round(callbacks / elapsed),
+        frames_per_second=round(BENCHMARK_FRAMES / elapsed),
+        dispatches_per_frame=(manager.stats["dispatches"] - dispatches) / BENCHMARK_FRAMES,
+        listener_calls_per_frame=(_listener_calls(manager) - listener_calls) / BENCHMARK_FRAMES,
+        async_update_per_frame=mock_update.call_count / BENCHMARK_FRAMES,
+        state_writes_per_frame=writes / BENCHMARK_FRAMES,
+        state_writes_by_platform=dict(state_writes),
+        state_writes_suppressed=manager.stats["state_writes_suppressed"],
+        loop_lag_p99_ms=lag.histogram.percentile(99),
+        loop_lag_max_ms=round(lag.histogram.maximum, 2),
+    )
+
+    # Callbacks for the same device in one frame are merged into one dispatch
+    assert manager.stats["dispatches"] - dispatches == BENCHMARK_FRAMES * BENCHMARK_DEVICES_PER_FRAME
+    # Pushed updates never fall back to a full async_update
+    assert mock_update.call_count == 0
+    # Only entities of the devices in the frame write
+    assert writes <= BENCHMARK_FRAMES * BENCHMARK_DEVICES_PER_FRAME * len(entities) / len(manager.get_devices())
+
+
+async def test_broadcast_refresh(hass, config_entry, benchmark_manager, state_writes, benchmark_report):
+    """Refresh every entity at once, as happens when the connection comes back."""
+    entities = await _async_setup_all(hass, config_entry)
+    manager = benchmark_manager
+    state_writes.clear()
+
+    with EventLoopLag() as lag:
+        start = time.monotonic()
+        await manager._async_dispatch()
+        elapsed = time.monotonic() - start
+        await asyncio.sleep(0)
+
+    benchmark_report(
+        entities=len(entities),
+        refresh_ms=round(elapsed * 1000, 2),
+        state_writes=sum(state_writes.values()),
+        dispatch_latency_ms=manager.dispatch_latency.as_dict()["mean_ms"],
+        loop_lag_max_ms=round(lag.histogram.maximum, 2),
+    )
+    assert sum(state_writes.values()) <= len(entities)
@@ -0,0 +1,205 @@
+"""End-to-end benchmarks of the local transports against simulated units."""
+
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_DEVICE, CONF_HOST, CONF_PASSWORD, CONF_USERNAME
+from pyintesishome.const import DEVICE_INTESISBOX, DEVICE_INTESISHOME_LOCAL
+from simulator import Faults, Simulator
+
+from custom_components.intesisaccloud import DOMAIN, async_setup_entry, climate, sensor, switch
+from custom_components.intesisaccloud.metrics import LatencyHistogram
+
+from .fake_account import async_setup_platform
+
+SIMULATOR_UNITS = int(os.environ.get("INTESIS_SIMULATOR_UNITS", 4))
+SIMULATOR_FRAMES = int(os.environ.get("INTESIS_SIMULATOR_FRAMES", 50))
+SIMULATOR_LATENCY = float(os.environ.get("INTESIS_SIMULATOR_LATENCY", 0.02))
+
+# Seconds an end-to-end condition may take before the benchmark fails
+SETTLE_TIMEOUT = 10
+
+# Entries dispatch and send commands straight away, so only the transports are measured
+ENTRY_OPTIONS = {"coalesce_window": 0, "device_command_interval": 0, "account_command_interval": 0}
+
+
+async def _async_wait_for(condition):
+    async with asyncio.timeout(SETTLE_TIMEOUT):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+@pytest.fixture
+async def simulated_setup(hass, state_writes):
+    """Set up a config entry per simulated unit through the integration itself."""
+    hass.loop = asyncio.get_running_loop()
+    session = aiohttp.ClientSession()
+    simulators = []
+    managers = []
+
+    async def async_setup(simulator):
+        simulators.append(simulator)
+        await simulator.async_start()
+        entries = [{CONF_DEVICE: DEVICE_INTESISBOX, CONF_HOST: server.host} for server in simulator.wmp_servers] + [
+            {
+                CONF_DEVICE: DEVICE_INTESISHOME_LOCAL,
+                CONF_HOST: server.address,
+                CONF_USERNAME: server.username,
+                CONF_PASSWORD: server.password,
+            }
+            for server in simulator.http_servers
+        ]
+
+        async def async_setup_one(data):
+            entry = MagicMock(spec=ConfigEntry)
+            entry.data = data
+            entry.options = ENTRY_OPTIONS
+            entry.unique_id = entry.entry_id = entry.title = data[CONF_HOST]
+            entry.async_create_background_task.side_effect = lambda hass, coro, name: (
+                asyncio.get_running_loop().create_task(coro)
+            )
+            await async_setup_entry(hass, entry)
+            manager = hass.data[DOMAIN]["controller"][entry.entry_id]
+            managers.append(manager)
+            for platform in (climate, sensor, switch):
+                await async_setup_platform(hass, entry, platform)
+            return manager
+
+        start = time.monotonic()
+        setup = await asyncio.gather(*(async_setup_one(data) for data in entries))
+        return setup, time.monotonic() - start
+
+    with (
+        patch("homeassistant.helpers.aiohttp_client.async_get_clientsession", return_value=session),
+        patch("custom_components.intesisaccloud.manager.async_track_time_interval"),
+        # Entries connect on setup, as they do without a snapshot from a previous run
+        patch("custom_components.intesisaccloud.DeviceSnapshotStore") as mock_store,
+    ):
+        mock_store.return_value.async_load = AsyncMock(return_value=None)
+        yield async_setup
+
+        for manager in managers:
+            await manager.stop()
+        for simulator in simulators:
+            await simulator.async_stop()
+        await session.close()
+
+
+async def test_wmp_push_latency(simulated_setup, benchmark_report):
+    """Change every IntesisBox unit and time how long until the integration has the change."""
+    simulator = Simulator(wmp_units=SIMULATOR_UNITS)
+    managers, setup_time = await simulated_setup(simulator)
+    latency = LatencyHistogram()
+
+    start = time.monotonic()
+    for frame in range(SIMULATOR_FRAMES):
+        pushed = time.monotonic()
+        for server in simulator.wmp_servers:
+            server.unit.set(10, 200 + frame)
+        for manager in managers:
+            device_id = next(iter(manager.get_devices()))
+            await _async_wait_for(
+                lambda manager=manager, device_id=device_id, frame=frame: (
+                    manager.get_device_snapshot(device_id).get("temperature") == str(200 + frame)
+                )
+            )
+            latency.record(time.monotonic() - pushed)
+    elapsed = time.monotonic() - start
+
+    benchmark_report(
+        units=SIMULATOR_UNITS,
+        setup_seconds=round(setup_time, 3),
+        updates_per_second=round(SIMULATOR_UNITS * SIMULATOR_FRAMES / elapsed),
+        push_latency_p50_ms=latency.percentile(50),
+        push_latency_p99_ms=latency.percentile(99),
+        push_latency_max_ms=round(latency.maximum, 2),
+    )
+
+
+@pytest.mark.parametrize("transport", ["wmp", "http"])
+async def test_command_latency(simulated_setup, benchmark_report, transport):
+    """Time setpoint commands through the manager against units answering with latency."""
+    faults = Faults(latency=SIMULATOR_LATENCY)
+    simulator = (
+        Simulator(wmp_units=SIMULATOR_UNITS, faults=faults)
+        if transport == "wmp"
+        else Simulator(http_units=SIMULATOR_UNITS, faults=faults)
+    )
+    managers, _ = await simulated_setup(simulator)
+
+    async def async_send(manager):
+        device_id = next(iter(manager.get_devices()))
+        for frame in range(SIMULATOR_FRAMES):
+            await manager.async_send_commands(device_id, {"setpoint": ("set_temperature", 18 + frame % 10)})
+
+    start = time.monotonic()
+    await asyncio.gather(*(async_send(manager) for manager in managers))
+    elapsed = time.monotonic() - start
+
+    summary = LatencyHistogram()
+    for manager in managers:
+        for bucket, count in enumerate(manager.command_latency.buckets):
+            summary.buckets[bucket] += count
+        summary.count += manager.command_latency.count
+        summary.maximum = max(summary.maximum, manager.command_latency.maximum)
+    benchmark_report(
+        units=SIMULATOR_UNITS,
+        injected_latency_ms=SIMULATOR_LATENCY * 1000,
+        commands_per_second=round(SIMULATOR_UNITS * SIMULATOR_FRAMES / elapsed),
+        round_trip_p50_ms=summary.percentile(50),
+        round_trip_p99_ms=summary.percentile(99),
+        round_trip_max_ms=round(summary.maximum, 2),
+    )
+    assert all(
+        server.unit.datapoints[9] == 180 + (SIMULATOR_FRAMES - 1) % 10 * 10
+        for server in (*simulator.wmp_servers, *simulator.http_servers)
+    )
+
+
+async def test_wmp_reconnect(simulated_setup, benchmark_report):
+    """Drop every IntesisBox connection and time how long until all are back."""
+    simulator = Simulator(wmp_units=SIMULATOR_UNITS)
+    with patch("custom_components.intesisaccloud.manager.RECONNECT_BASE_DELAY", 0.05):
+        managers, _ = await simulated_setup(simulator)
+        for manager in managers:
+            manager.controller._reconnect_delay_initial = 0.05
+
+        start = time.monotonic()
+        simulator.disconnect()
+        await _async_wait_for(lambda: not any(manager.is_connected for manager in managers))
+        await _async_wait_for(lambda: all(manager.is_connected for manager in managers))
+        elapsed = time.monotonic() - start
+
+    benchmark_report(
+        units=SIMULATOR_UNITS,
+        all_reconnected_ms=round(elapsed * 1000, 2),
+        outage_max_ms=round(max(manager.outage_duration.maximum for manager in managers), 2),
+        reconnect_attempts=sum(manager.stats["reconnect_attempts"] for manager in managers),
+    )
+
+
+async def test_http_polling_with_drops(simulated_setup, benchmark_report):
+    """Poll local HTTP units that lose a share of their requests."""
+    faults = Faults(drop_rate=0.2, seed=0)
+    simulator = Simulator(http_units=SIMULATOR_UNITS, faults=faults)
+    managers, _ = await simulated_setup(simulator)
+    for manager in managers:
+        manager.controller._scan_interval = 0.05
+    requests = sum(server.requests_received for server in simulator.http_servers)
+
+    await asyncio.sleep(2)
+
+    benchmark_report(
+        units=SIMULATOR_UNITS,
+        drop_rate=faults.drop_rate,
+        requests=sum(server.requests_received for server in simulator.http_servers) - requests,
+        callbacks=sum(manager.stats["callbacks_received"] for manager in managers),
+        still_connected=sum(manager.is_connected for manager in managers),
+    )
+    # Dropped polls are retried without the devices going unavailable
+    assert all(manager.is_connected for manager in managers)
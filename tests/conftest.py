@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.util.unit_system import METRIC_SYSTEM
 
 from custom_components.intesisaccloud import DOMAIN
 
@@ -14,7 +15,10 @@ def hass():
     hass.data = {DOMAIN: {}}
     hass.config_entries = MagicMock()
     hass.config_entries.async_forward_entry_setups = AsyncMock()
+    hass.services = MagicMock()
     hass.loop = MagicMock()
+    hass.config = MagicMock()
+    hass.config.units = METRIC_SYSTEM
     return hass
 
 @pytest.fixture
@@ -27,8 +31,10 @@ def config_entry():
         "password": "password",
         "device": "IntesisHome"
     }
+    entry.options = {}
     entry.entry_id = "test_entry_id"
     entry.unique_id = "test_unique_id"
+    entry.title = "Test"
     return entry
 
 @pytest.fixture
@@ -0,0 +1,58 @@
+"""Local stand-ins for IntesisBox (WMP) and IntesisHome local (HTTP) devices.
+
+Each simulated unit is served on its own address, so the real controllers
+and the whole integration can be exercised without hardware. Latency,
+dropped requests and disconnects are injected through ``Faults``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from .local_api import LocalApiServer
+from .unit import Faults, SimulatedUnit
+from .wmp import WMP_PORT, WmpServer
+
+__all__ = ["Faults", "LocalApiServer", "SimulatedUnit", "Simulator", "WmpServer", "WMP_PORT"]
+
+
+class Simulator:
+    """A number of WMP and local HTTP units sharing one set of faults."""
+
+    def __init__(self, wmp_units: int = 0, http_units: int = 0, faults: Faults | None = None) -> None:
+        """Initialize the units, nothing listens until started."""
+        self.faults = faults or Faults()
+        self.wmp_servers = [
+            WmpServer(SimulatedUnit(f"0011223344{index:02X}", f"WMP {index}", "IS-IR-WMP-1"), self.faults)
+            for index in range(wmp_units)
+        ]
+        self.http_servers = [
+            LocalApiServer(SimulatedUnit(f"SIM{index:06d}", f"HTTP {index}"), self.faults)
+            for index in range(http_units)
+        ]
+
+    @property
+    def units(self) -> list[SimulatedUnit]:
+        """Return every simulated unit."""
+        return [server.unit for server in (*self.wmp_servers, *self.http_servers)]
+
+    async def async_start(self, wmp_port: int = WMP_PORT) -> None:
+        """Start every server, WMP units each get their own loopback address."""
+        await asyncio.gather(
+            *(server.async_start(f"127.0.0.{index + 2}", wmp_port) for index, server in enumerate(self.wmp_servers)),
+            *(server.async_start() for server in self.http_servers),
+        )
+
+    async def async_stop(self) -> None:
+        """Stop every server."""
+        await asyncio.gather(*(server.async_stop() for server in (*self.wmp_servers, *self.http_servers)))
+
+    def disconnect(self) -> None:
+        """Drop the connections and sessions of every unit."""
+        for server in (*self.wmp_servers, *self.http_servers):
+            server.disconnect()
+
+    def set_online(self, online: bool) -> None:
+        """Take every unit off the network, or bring them back."""
+        for server in (*self.wmp_servers, *self.http_servers):
+            server.online = online
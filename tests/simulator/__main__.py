@@ -0,0 +1,42 @@
+"""Run simulated units until interrupted, e.g. ``python -m simulator --wmp 2 --http 4`` from tests/."""
+
+import argparse
+import asyncio
+import logging
+
+from . import Faults, Simulator
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    simulator = Simulator(args.wmp, args.http, Faults(args.latency, args.jitter, args.drop_rate))
+    await simulator.async_start(args.wmp_port)
+    for server in simulator.wmp_servers:
+        print(f"IntesisBox {server.unit.serial} on {server.host}:{server.port}")
+    for server in simulator.http_servers:
+        print(f"IntesisHome local {server.unit.serial} on {server.address} ({server.username}/{server.password})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.async_stop()
+
+
+def main() -> None:
+    """Parse the arguments and serve."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--wmp", type=int, default=1, help="IntesisBox units")
+    parser.add_argument("--http", type=int, default=1, help="IntesisHome local units")
+    parser.add_argument("--wmp-port", type=int, default=3310)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds at random")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of requests never answered")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+    try:
+        asyncio.run(_async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Local HTTP API (api.cgi) server for a simulated unit."""
+
+from __future__ import annotations
+
+import secrets
+
+from aiohttp import web
+
+from .unit import DATAPOINT_STATES, Faults, SimulatedUnit
+
+# Error codes the devices answer with, 1 and 5 make clients log in again
+ERROR_SESSION = 1
+ERROR_CREDENTIALS = 5
+
+
+def _error(code: int, message: str) -> web.Response:
+    return web.json_response({"success": False, "error": {"code": code, "message": message}})
+
+
+def _success(data: dict | None = None) -> web.Response:
+    return web.json_response({"success": True, "data": data})
+
+
+class LocalApiServer:
+    """Serves one unit over the local HTTP API, like an IntesisHome WiFi adapter does."""
+
+    def __init__(
+        self, unit: SimulatedUnit, faults: Faults | None = None, username: str = "admin", password: str = "admin"
+    ) -> None:
+        """Initialize the server."""
+        self.unit = unit
+        self.faults = faults or Faults()
+        self.username = username
+        self.password = password
+        # Requests fail while the unit is offline
+        self.online = True
+        self.host = None
+        self.port = None
+        self.requests_received = 0
+        self._session_id = None
+        self._runner = None
+        self._handlers = {
+            "login": self._login,
+            "getinfo": self._get_info,
+            "getavailabledatapoints": self._get_available_datapoints,
+            "getdatapointvalue": self._get_datapoint_value,
+            "setdatapointvalue": self._set_datapoint_value,
+        }
+
+    @property
+    def address(self) -> str:
+        """Return the host and port clients use as their host."""
+        return f"{self.host}:{self.port}"
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening, on a free port unless one is given."""
+        app = web.Application()
+        app.router.add_post("/api.cgi", self._async_handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.host, self.port = self._runner.addresses[0][:2]
+
+    async def async_stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def disconnect(self) -> None:
+        """Expire the session, as a reboot of the adapter does."""
+        self._session_id = None
+
+    async def _async_handle(self, request: web.Request) -> web.StreamResponse:
+        """Answer one api.cgi request."""
+        self.requests_received += 1
+        if not self.online or self.faults.drop():
+            # Closing without an answer looks like a lost packet to the client
+            request.transport.close()
+            return web.Response(status=500)
+        await self.faults.async_delay()
+
+        payload = await request.json()
+        command = payload.get("command")
+        data = payload.get("data") or {}
+        if (handler := self._handlers.get(command)) is None:
+            return _error(2, f"Unknown command {command}")
+        if command != "login" and data.get("sessionID") != self._session_id:
+            return _error(ERROR_SESSION, "Invalid session")
+        return handler(data)
+
+    def _login(self, data: dict) -> web.Response:
+        if data.get("username") != self.username or data.get("password") != self.password:
+            return _error(ERROR_CREDENTIALS, "Invalid username or password")
+        self._session_id = secrets.token_hex(8)
+        return _success({"id": {"sessionID": self._session_id}})
+
+    def _get_info(self, data: dict) -> web.Response:
+        unit = self.unit
+        return _success(
+            {
+                "info": {
+                    "sn": f"{unit.serial} 0",
+                    "ownSSID": unit.name,
+                    "deviceModel": unit.model,
+                    "wlanFwVersion": "1.3.3",
+                    "rssi": unit.rssi,
+                    "acStatus": 0,
+                }
+            }
+        )
+
+    def _get_available_datapoints(self, data: dict) -> web.Response:
+        datapoints = [
+            {
+                "uid": uid,
+                "rw": "rw" if uid in DATAPOINT_STATES else "r",
+                "descr": {"states": DATAPOINT_STATES.get(uid, [])},
+            }
+            for uid in self.unit.datapoints
+        ]
+        return _success({"dp": {"datapoints": datapoints}})
+
+    def _get_datapoint_value(self, data: dict) -> web.Response:
+        datapoints = self.unit.datapoints
+        if data.get("uid") == "all":
+            return _success({"dpval": [{"uid": uid, "value": value} for uid, value in datapoints.items()]})
+        if (uid := data.get("uid")) not in datapoints:
+            return _error(3, f"Unknown datapoint {uid}")
+        return _success({"dpval": {"uid": uid, "value": datapoints[uid]}})
+
+    def _set_datapoint_value(self, data: dict) -> web.Response:
+        uid, value = data.get("uid"), data.get("value")
+        if uid not in DATAPOINT_STATES and uid not in self.unit.datapoints:
+            return _error(3, f"Unknown datapoint {uid}")
+        if uid in DATAPOINT_STATES and value not in DATAPOINT_STATES[uid]:
+            return _error(4, f"Invalid value {value} for datapoint {uid}")
+        self.unit.set(uid, value)
+        return _success({})
@@ -0,0 +1,91 @@
+"""Simulated air conditioning units and the faults injected into their replies."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+# Datapoint uids shared by the local HTTP API and the cloud
+UID_POWER = 1
+UID_MODE = 2
+UID_FAN_SPEED = 4
+UID_VVANE = 5
+UID_SETPOINT = 9
+UID_TEMPERATURE = 10
+UID_SETPOINT_MIN = 35
+UID_SETPOINT_MAX = 36
+UID_OUTDOOR_TEMP = 37
+
+# States each writable datapoint accepts, these match fan map 31 and the usual modes
+DATAPOINT_STATES = {
+    UID_POWER: [0, 1],
+    UID_MODE: [0, 1, 2, 3, 4],
+    UID_FAN_SPEED: [0, 1, 2, 3, 4],
+    UID_VVANE: [0, 1, 2, 3, 10],
+}
+
+DEFAULT_DATAPOINTS = {
+    UID_POWER: 1,
+    UID_MODE: 4,
+    UID_FAN_SPEED: 2,
+    UID_VVANE: 0,
+    UID_SETPOINT: 220,
+    UID_TEMPERATURE: 215,
+    UID_SETPOINT_MIN: 180,
+    UID_SETPOINT_MAX: 300,
+    UID_OUTDOOR_TEMP: 150,
+}
+
+
+@dataclass
+class Faults:
+    """Faults a simulated server injects, they may be changed while it runs."""
+
+    # Seconds added before every reply, plus up to jitter seconds at random
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Share of requests that are never answered
+    drop_rate: float = 0.0
+    seed: int | None = None
+    _random: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Seed the generator so a run can be repeated."""
+        self._random = random.Random(self.seed)
+
+    async def async_delay(self) -> None:
+        """Wait for the configured latency."""
+        if delay := self.latency + self._random.uniform(0, self.jitter):
+            await asyncio.sleep(delay)
+
+    def drop(self) -> bool:
+        """Return if the current request should be dropped."""
+        return self.drop_rate > 0 and self._random.random() < self.drop_rate
+
+
+class SimulatedUnit:
+    """State of one unit, keyed by datapoint uid."""
+
+    def __init__(self, serial: str, name: str, model: str = "MH-AC-WIFI-1") -> None:
+        """Initialize the unit with default datapoints."""
+        self.serial = serial
+        self.name = name
+        self.model = model
+        self.datapoints = dict(DEFAULT_DATAPOINTS)
+        self.rssi = -55
+        self._listeners: list[Callable[[int, int], None]] = []
+
+    def subscribe(self, listener: Callable[[int, int], None]) -> Callable[[], None]:
+        """Call listener with the uid and value of every change, return a function to unsubscribe."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def set(self, uid: int, value: int) -> None:
+        """Change a datapoint, as the unit or its remote would."""
+        if self.datapoints.get(uid) == value:
+            return
+        self.datapoints[uid] = value
+        for listener in list(self._listeners):
+            listener(uid, value)
@@ -0,0 +1,161 @@
+"""IntesisBox (WMP) line protocol server for a simulated unit."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from functools import partial
+
+from .unit import (
+    UID_FAN_SPEED,
+    UID_MODE,
+    UID_POWER,
+    UID_SETPOINT,
+    UID_SETPOINT_MAX,
+    UID_SETPOINT_MIN,
+    UID_TEMPERATURE,
+    UID_VVANE,
+    Faults,
+    SimulatedUnit,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# The port IntesisBox devices listen on, pyintesishome does not allow another
+WMP_PORT = 3310
+
+# WMP functions and the datapoint each one reads and writes
+WMP_FUNCTIONS = {
+    "ONOFF": UID_POWER,
+    "MODE": UID_MODE,
+    "FANSP": UID_FAN_SPEED,
+    "VANEUD": UID_VVANE,
+    "SETPTEMP": UID_SETPOINT,
+    "AMBTEMP": UID_TEMPERATURE,
+}
+WMP_VALUES = {
+    "ONOFF": {0: "OFF", 1: "ON"},
+    "MODE": {0: "AUTO", 1: "HEAT", 2: "DRY", 3: "FAN", 4: "COOL"},
+    "FANSP": {0: "AUTO", 1: "1", 2: "2", 3: "3", 4: "4"},
+    "VANEUD": {0: "AUTO", 1: "1", 2: "2", 3: "3", 10: "SWING"},
+}
+UID_FUNCTIONS = {uid: function for function, uid in WMP_FUNCTIONS.items()}
+
+
+def _encode(function: str, value: int) -> str:
+    """Return the WMP representation of a datapoint value."""
+    return WMP_VALUES.get(function, {}).get(value, str(value))
+
+
+def _decode(function: str, value: str) -> int | None:
+    """Return the datapoint value for a WMP value, None if the unit does not accept it."""
+    if function not in WMP_VALUES:
+        return int(value) if value.lstrip("-").isdigit() else None
+    for datapoint, text in WMP_VALUES[function].items():
+        if text == value.upper():
+            return datapoint
+    return None
+
+
+class WmpServer:
+    """Serves one unit over the WMP line protocol, like an IntesisBox does."""
+
+    def __init__(self, unit: SimulatedUnit, faults: Faults | None = None) -> None:
+        """Initialize the server."""
+        self.unit = unit
+        self.faults = faults or Faults()
+        # Connections are refused while the unit is offline
+        self.online = True
+        self.host = None
+        self.port = None
+        self.commands_received = 0
+        self._server = None
+        self._writers = set()
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = WMP_PORT) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(self._async_handle, host, port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+
+    async def async_stop(self) -> None:
+        """Stop listening and close every connection."""
+        self.disconnect()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def disconnect(self) -> None:
+        """Drop every open connection, clients may connect again."""
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+
+    async def _async_handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the commands of one client and push the unit's changes to it."""
+        if not self.online:
+            writer.close()
+            return
+
+        self._writers.add(writer)
+        unsubscribe = self.unit.subscribe(partial(self._push, writer))
+        try:
+            while True:
+                line = (await reader.readuntil(b"\r")).decode("ascii").strip()
+                if not line:
+                    continue
+                self.commands_received += 1
+                if self.faults.drop():
+                    _LOGGER.debug("Dropping %s", line)
+                    continue
+                await self.faults.async_delay()
+                self._handle_command(writer, line)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            unsubscribe()
+            self._writers.discard(writer)
+            writer.close()
+
+    def _handle_command(self, writer: asyncio.StreamWriter, line: str) -> None:
+        """Answer a single command."""
+        unit = self.unit
+        command, _, args = line.partition(":")
+        if command == "ID":
+            self._write(writer, f"ID:{unit.model},{unit.serial},{self.host},ASCII,v1.3.3,{unit.rssi}")
+        elif command == "LIMITS":
+            self._write_limits(writer, args)
+        elif command == "GET,1":
+            functions = WMP_FUNCTIONS if args == "*" else [args]
+            for function in functions:
+                if (uid := WMP_FUNCTIONS.get(function)) is not None:
+                    self._write(writer, f"CHN,1:{function},{_encode(function, unit.datapoints[uid])}")
+        elif command == "SET,1":
+            function, _, value = args.partition(",")
+            if function not in WMP_FUNCTIONS or (datapoint := _decode(function, value)) is None:
+                self._write(writer, "ERR")
+                return
+            self._write(writer, "ACK")
+            unit.set(WMP_FUNCTIONS[function], datapoint)
+        else:
+            self._write(writer, "ERR")
+
+    def _push(self, writer: asyncio.StreamWriter, uid: int, value: int) -> None:
+        """Push a change of the unit, as the box does to every client."""
+        if (function := UID_FUNCTIONS.get(uid)) is not None:
+            self._write(writer, f"CHN,1:{function},{_encode(function, value)}")
+
+    def _write_limits(self, writer: asyncio.StreamWriter, function: str) -> None:
+        """Answer a LIMITS query, functions the unit lacks are never answered."""
+        if function == "SETPTEMP":
+            limits = [self.unit.datapoints[UID_SETPOINT_MIN], self.unit.datapoints[UID_SETPOINT_MAX]]
+        elif function in WMP_VALUES:
+            limits = WMP_VALUES[function].values()
+        else:
+            return
+        self._write(writer, f"LIMITS:{function},[{','.join(str(limit) for limit in limits)}]")
+
+    def _write(self, writer: asyncio.StreamWriter, line: str) -> None:
+        """Send one line to a client."""
+        if not writer.is_closing():
+            writer.write(f"{line}\r\n".encode("ascii"))
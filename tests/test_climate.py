@@ -1,9 +1,32 @@
-from homeassistant.components.climate import HVACMode
+from collections import Counter
+from dataclasses import replace
+from functools import cache
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+from homeassistant.components.climate import SWING_OFF, SWING_VERTICAL, ClimateEntityFeature, HVACMode
+
+from custom_components.intesisaccloud.capabilities import DeviceCapabilities
 from custom_components.intesisaccloud.climate import IntesisAC
+from custom_components.intesisaccloud.manager import IntesisManager
+
 
+@pytest.fixture
+def mock_manager(mock_controller):
+    """Mock IntesisManager wrapping the mock controller."""
+    manager = MagicMock()
+    manager.controller = mock_controller
+    manager.device_type = "IntesisHome"
+    manager.is_connected = True
+    manager.is_restored = False
+    manager.stats = Counter()
+    manager.get_capabilities.side_effect = cache(
+        lambda device_id: DeviceCapabilities.from_controller(mock_controller, device_id)
+    )
+    return manager
 
-async def test_climate_entity_creation(hass, mock_controller):
+
+async def test_climate_entity_creation(hass, mock_controller, mock_manager):
     """Test successful creation of IntesisAC entity."""
     device_id = "12345"
     device_info = {
@@ -20,13 +43,14 @@ async def test_climate_entity_creation(hass, mock_controller):
     mock_controller.get_fan_speed_list.return_value = ["low", "high"]
     mock_controller.get_mode_list.return_value = ["auto", "cool", "heat", "dry", "fan", "off"]
 
-    entity = IntesisAC(device_id, device_info, mock_controller)
+    entity = IntesisAC(device_id, device_info, mock_manager)
 
     assert entity.name == "Test AC"
     assert entity.unique_id == device_id
     assert entity.available is False  # explicit False init, updates to True on update
+    assert entity.should_poll is False
 
-async def test_climate_update(hass, mock_controller):
+async def test_climate_update(hass, mock_controller, mock_manager):
     """Test entity update from controller."""
     device_id = "12345"
     device_info = {"name": "Test AC"}
@@ -38,25 +62,20 @@ async def test_climate_update(hass, mock_controller):
     mock_controller.get_fan_speed_list.return_value = ["auto"]
     mock_controller.get_mode_list.return_value = ["cool"]
 
-    entity = IntesisAC(device_id, device_info, mock_controller)
+    entity = IntesisAC(device_id, device_info, mock_manager)
 
     # Mock return values for async_update
-    mock_controller.is_connected = True
     mock_controller.get_temperature.return_value = 22.0
     mock_controller.get_fan_speed.return_value = "auto"
     mock_controller.is_on.return_value = True
     mock_controller.get_min_setpoint.return_value = 18
     mock_controller.get_max_setpoint.return_value = 30
-    mock_controller.get_rssi.return_value = 10
-    mock_controller.get_run_hours.return_value = 100
     mock_controller.get_setpoint.return_value = 24.0
     mock_controller.get_outdoor_temperature.return_value = 30.0
     mock_controller.get_mode.return_value = "cool"
     mock_controller.get_preset_mode.return_value = "eco"
     mock_controller.get_vertical_swing.return_value = "auto/stop"
     mock_controller.get_horizontal_swing.return_value = "auto/stop"
-    mock_controller.get_heat_power_consumption.return_value = 0
-    mock_controller.get_cool_power_consumption.return_value = 1000
 
     await entity.async_update()
 
@@ -64,3 +83,210 @@ async def test_climate_update(hass, mock_controller):
     assert entity.current_temperature == 22.0
     assert entity.target_temperature == 24.0
     assert entity.hvac_mode == HVACMode.COOL
+
+
+async def test_climate_push_frame_updates_once(hass, mock_controller, config_entry):
+    """Test each push frame triggers exactly one update per affected entity."""
+    devices = {"1": {"name": "AC 1", "setpoint": 220}, "2": {"name": "AC 2"}}
+    controller_callbacks = []
+    mock_controller.get_devices.return_value = devices
+    mock_controller.get_device.side_effect = devices.get
+    mock_controller.add_update_callback.side_effect = controller_callbacks.append
+    mock_controller.get_fan_speed_list.return_value = []
+    mock_controller.get_mode_list.return_value = []
+
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    await manager.async_connect()
+    entities = [IntesisAC(device_id, device, manager) for device_id, device in devices.items()]
+    for entity in entities:
+        entity._async_refresh_from_controller = MagicMock()
+        entity._async_apply_changed_keys = MagicMock()
+        await entity.async_added_to_hass()
+
+    # The controller only ever sees the manager
+    assert controller_callbacks == [manager.async_update_callback]
+
+    # One status frame calling back repeatedly for device 1
+    devices["1"]["setpoint"] = 230
+    for _ in range(3):
+        await controller_callbacks[0](device_id="1")
+    await manager._async_dispatch_pending()
+
+    # Compared against the state discovered on connect, only the setpoint changed
+    entities[0]._async_apply_changed_keys.assert_called_once_with(frozenset({"setpoint"}))
+    entities[0]._async_refresh_from_controller.assert_not_called()
+    entities[1]._async_apply_changed_keys.assert_not_called()
+    entities[1]._async_refresh_from_controller.assert_not_called()
+
+
+async def test_climate_incremental_update(hass, mock_controller, mock_manager):
+    """Test changed keys only refresh the affected attributes."""
+    device_id = "12345"
+    device_info = {"name": "Test AC"}
+    mock_controller.get_fan_speed_list.return_value = []
+    mock_controller.get_mode_list.return_value = ["cool"]
+    mock_controller.get_device.return_value = device_info
+
+    entity = IntesisAC(device_id, device_info, mock_manager)
+    entity._connected = True
+    entity.async_write_ha_state = MagicMock()
+    entity._async_refresh_from_controller = MagicMock()
+
+    mock_controller.get_setpoint.return_value = 24.0
+    await entity.async_update_callback(device_id, frozenset({"setpoint"}))
+    assert entity._state.target_temp == 24.0
+    mock_controller.get_setpoint.assert_called_once_with(device_id)
+    mock_controller.get_temperature.assert_not_called()
+    entity.async_write_ha_state.assert_called_once()
+    entity._async_refresh_from_controller.assert_not_called()
+
+    # Keys the climate entity does not show are left to the sensors
+    await entity.async_update_callback(device_id, frozenset({"rssi", "unknown_uid_1"}))
+    mock_controller.get_rssi.assert_not_called()
+    entity.async_write_ha_state.assert_called_once()
+
+    # Unknown changes fall back to a full refresh
+    await entity.async_update_callback(device_id, None)
+    entity._async_refresh_from_controller.assert_called_once()
+    assert entity.async_write_ha_state.call_count == 2
+
+
+async def test_climate_suppresses_unchanged_writes(hass, mock_controller, mock_manager):
+    """Test a full refresh that changes nothing visible does not write state."""
+    device_id = "12345"
+    device_info = {"name": "Test AC"}
+    mock_controller.get_fan_speed_list.return_value = []
+    mock_controller.get_mode_list.return_value = ["cool"]
+    mock_controller.get_device.return_value = device_info
+    mock_controller.get_temperature.return_value = 22.0
+    mock_controller.get_setpoint.return_value = 24.0
+    mock_controller.get_min_setpoint.return_value = 18
+    mock_controller.get_max_setpoint.return_value = 30
+    mock_controller.get_fan_speed.return_value = None
+    mock_controller.get_outdoor_temperature.return_value = None
+    mock_controller.get_mode.return_value = "cool"
+    mock_controller.is_on.return_value = True
+    mock_controller.get_rssi.return_value = -60
+
+    entity = IntesisAC(device_id, device_info, mock_manager)
+    entity.hass = hass
+    entity._connected = True
+
+    with patch("homeassistant.helpers.entity.Entity.async_write_ha_state") as mock_write:
+        await entity.async_update_callback(device_id, None)
+        mock_controller.get_rssi.return_value = -70
+        await entity.async_update_callback(device_id, None)
+        assert mock_write.call_count == 1
+
+        mock_controller.get_temperature.return_value = 23.0
+        await entity.async_update_callback(device_id, None)
+        assert mock_write.call_count == 2
+
+        # A new mode list changes the entity's options, not its state
+        mock_manager.get_capabilities.side_effect = None
+        mock_manager.get_capabilities.return_value = replace(entity._capabilities, modes=("cool", "heat"))
+        await entity.async_update_callback(device_id, frozenset({"model"}))
+        assert mock_write.call_count == 3
+
+    assert mock_manager.stats["state_writes_suppressed"] == 1
+
+    # Home Assistant writes after async_update itself, so the next write goes through
+    await entity.async_update()
+    assert entity._last_fingerprint is None
+
+
+async def test_climate_set_temperature_with_mode_sends_one_batch(hass, mock_controller, mock_manager):
+    """Test a mode change and setpoint from one service call are sent together."""
+    mock_controller.get_fan_speed_list.return_value = []
+    mock_controller.get_mode_list.return_value = ["cool"]
+    mock_manager.async_send_commands = AsyncMock()
+
+    entity = IntesisAC("12345", {"name": "Test AC"}, mock_manager)
+    entity.hass = hass
+    entity._state.target_temp = 20
+    entity.async_write_ha_state = MagicMock()
+
+    await entity.async_set_temperature(temperature=23, hvac_mode=HVACMode.COOL)
+
+    mock_manager.async_send_commands.assert_awaited_once_with(
+        "12345",
+        {
+            "power": ("set_power_on",),
+            "mode": ("set_mode", "cool"),
+            "setpoint": ("set_temperature", 23),
+        },
+    )
+    assert entity.hvac_mode == HVACMode.COOL
+    assert entity._state.target_temp == 23
+
+
+async def test_climate_optimistic_state_confirm_and_rollback(hass, mock_controller, mock_manager):
+    """Test sent values mask stale reads until confirmed and roll back when never confirmed."""
+    mock_controller.get_fan_speed_list.return_value = []
+    mock_controller.get_mode_list.return_value = ["cool"]
+    mock_controller.get_device.return_value = {"name": "Test AC"}
+    mock_controller.get_preset_mode.return_value = "eco"
+    mock_controller.get_vertical_swing.return_value = "auto/stop"
+    mock_manager.async_send_commands = AsyncMock()
+    mock_manager.confirm_latency = {}
+
+    entity = IntesisAC("12345", {"name": "Test AC"}, mock_manager)
+    entity.hass = hass
+    entity.async_write_ha_state = MagicMock()
+    entity._async_refresh_from_controller()
+    assert entity.preset_mode == "eco"
+
+    with patch("custom_components.intesisaccloud.entity.async_call_later") as mock_call_later:
+        await entity.async_set_preset_mode("comfort")
+        await entity.async_set_swing_mode("vertical")
+    assert mock_call_later.call_count == 2
+    expire_swing = mock_call_later.call_args_list[1].args[2]
+
+    # A frame sent before the device applied the command does not undo it
+    await entity.async_update_callback("12345", frozenset({"climate_working_mode", "vvane"}))
+    assert entity.preset_mode == "comfort"
+    assert entity.swing_mode == "vertical"
+
+    mock_controller.get_preset_mode.return_value = "comfort"
+    await entity.async_update_callback("12345", frozenset({"climate_working_mode"}))
+    assert entity.preset_mode == "comfort"
+    assert mock_manager.stats["commands_confirmed"] == 1
+    assert mock_manager.confirm_latency["preset_mode"].count == 1
+
+    # The vane never moved, so the reported position is shown again
+    expire_swing(None)
+    assert entity.swing_mode == "off"
+    assert mock_manager.stats["commands_rolled_back"] == 1
+
+
+async def test_climate_follows_capability_profile(hass, mock_controller, mock_manager):
+    """Test features come from the shared profile and follow it when it is rebuilt."""
+    capabilities = DeviceCapabilities(setpoint_control=True, fan_speeds=("low", "high"), modes=("cool", "heat"))
+    mock_manager.get_capabilities.side_effect = None
+    mock_manager.get_capabilities.return_value = capabilities
+    mock_controller.get_device.return_value = {"name": "Test AC"}
+
+    entities = [IntesisAC(device_id, {"name": "Test AC"}, mock_manager) for device_id in ("1", "2")]
+    assert entities[0].supported_features == (
+        ClimateEntityFeature.TURN_ON
+        | ClimateEntityFeature.TURN_OFF
+        | ClimateEntityFeature.TARGET_TEMPERATURE
+        | ClimateEntityFeature.FAN_MODE
+    )
+    assert entities[0].hvac_modes == (HVACMode.COOL, HVACMode.HEAT, HVACMode.OFF)
+    assert entities[0].swing_modes == (SWING_OFF,)
+    # Devices with the same profile share their option lists
+    assert entities[1].hvac_modes is entities[0].hvac_modes
+    assert entities[1].swing_modes is entities[0].swing_modes
+    # Shown values are kept in slots rather than an instance dictionary
+    assert not hasattr(entities[0]._state, "__dict__")
+
+    entity = entities[0]
+    entity._connected = True
+    entity.async_write_ha_state = MagicMock()
+    mock_manager.get_capabilities.return_value = DeviceCapabilities(vertical_swing=True, modes=("cool",))
+    await entity.async_update_callback("1", frozenset({"model"}))
+    assert entity.swing_modes == (SWING_OFF, SWING_VERTICAL)
+    assert entity.hvac_modes == (HVACMode.COOL, HVACMode.OFF)
+    assert not entity.supported_features & ClimateEntityFeature.FAN_MODE
+    entity.async_write_ha_state.assert_called_once()
@@ -0,0 +1,180 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.intesisaccloud.commands import MAX_QUEUED_COMMANDS, RateLimiter
+from custom_components.intesisaccloud.manager import IntesisManager
+
+
+@pytest.fixture
+def manager(hass, mock_controller, config_entry):
+    """Manager whose background tasks run on the test loop."""
+    config_entry.async_create_background_task.side_effect = lambda hass, coro, name: (
+        asyncio.get_running_loop().create_task(coro)
+    )
+    config_entry.options = {"device_command_interval": 0, "account_command_interval": 0}
+    return IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+
+
+async def test_commands_are_merged_into_one_batch(manager, mock_controller):
+    """Test concurrent commands for a device are merged and the last setpoint wins."""
+    sent = []
+    for method in ("set_power_on", "set_mode", "set_temperature", "set_fan_speed"):
+        setattr(mock_controller, method, AsyncMock(side_effect=lambda *args, name=method: sent.append(name)))
+    mock_controller.is_on.return_value = False
+
+    with patch("custom_components.intesisaccloud.commands.COMMAND_BATCH_WINDOW", 0.01):
+        await asyncio.gather(
+            manager.async_send_commands(
+                "1", {"power": ("set_power_on",), "mode": ("set_mode", "cool"), "setpoint": ("set_temperature", 20)}
+            ),
+            manager.async_send_commands("1", {"setpoint": ("set_temperature", 22)}),
+            manager.async_send_commands("1", {"fan_speed": ("set_fan_speed", "low")}),
+        )
+
+    # Power and mode go first, everything else follows in the order it was queued
+    assert sent == ["set_power_on", "set_mode", "set_temperature", "set_fan_speed"]
+    mock_controller.set_temperature.assert_awaited_once_with("1", 22)
+    assert manager.stats["command_batches"] == 1
+    assert manager.stats["commands_merged"] == 1
+    assert manager.stats["commands_sent"] == 4
+    assert manager.command_latency.count == 3
+
+
+async def test_redundant_power_on_is_skipped(manager, mock_controller):
+    """Test powering on is dropped when the device already is on."""
+    mock_controller.set_power_on = AsyncMock()
+    mock_controller.set_mode = AsyncMock()
+    mock_controller.is_on.return_value = True
+
+    with patch("custom_components.intesisaccloud.commands.COMMAND_BATCH_WINDOW", 0):
+        await manager.async_send_commands("1", {"power": ("set_power_on",), "mode": ("set_mode", "heat")})
+
+    mock_controller.set_power_on.assert_not_awaited()
+    mock_controller.set_mode.assert_awaited_once_with("1", "heat")
+    assert manager.stats["commands_deduplicated"] == 1
+
+
+async def test_local_commands_are_sent_in_order(hass, mock_controller, config_entry):
+    """Test transports without pipelining send one command at a time."""
+    config_entry.async_create_background_task.side_effect = lambda hass, coro, name: (
+        asyncio.get_running_loop().create_task(coro)
+    )
+    manager = IntesisManager(hass, mock_controller, config_entry, "intesishome_local")
+    in_flight = MagicMock(count=0, peak=0)
+
+    async def send(*args):
+        in_flight.count += 1
+        in_flight.peak = max(in_flight.peak, in_flight.count)
+        await asyncio.sleep(0)
+        in_flight.count -= 1
+
+    mock_controller.set_mode = AsyncMock(side_effect=send)
+    mock_controller.set_temperature = AsyncMock(side_effect=send)
+
+    with patch("custom_components.intesisaccloud.commands.COMMAND_BATCH_WINDOW", 0):
+        await manager.async_send_commands("1", {"mode": ("set_mode", "heat"), "setpoint": ("set_temperature", 21)})
+
+    assert in_flight.peak == 1
+
+
+async def test_setpoint_lands_after_a_slow_mode_change(manager, mock_controller):
+    """Test a cloud batch waits for the mode before sending a setpoint the mode could reset."""
+    sent = []
+
+    async def set_mode(*args):
+        await asyncio.sleep(0.01)
+        sent.append("set_mode")
+
+    mock_controller.set_mode = AsyncMock(side_effect=set_mode)
+    mock_controller.set_temperature = AsyncMock(side_effect=lambda *args: sent.append("set_temperature"))
+
+    with patch("custom_components.intesisaccloud.commands.COMMAND_BATCH_WINDOW", 0.01):
+        await asyncio.gather(
+            manager.async_send_commands("1", {"setpoint": ("set_temperature", 21)}),
+            manager.async_send_commands("1", {"mode": ("set_mode", "heat")}),
+        )
+
+    assert sent == ["set_mode", "set_temperature"]
+
+
+async def test_command_errors_reach_the_caller(manager, mock_controller):
+    """Test a failing command is raised to every caller of the batch."""
+    mock_controller.set_mode = AsyncMock(side_effect=ValueError("boom"))
+
+    with patch("custom_components.intesisaccloud.commands.COMMAND_BATCH_WINDOW", 0), pytest.raises(ValueError):
+        await manager.async_send_commands("1", {"mode": ("set_mode", "heat")})
+
+
+async def test_stop_cancels_pending_commands(manager, mock_controller):
+    """Test unloading cancels commands that were not sent yet."""
+    mock_controller.set_mode = AsyncMock()
+    send = asyncio.get_running_loop().create_task(manager.async_send_commands("1", {"mode": ("set_mode", "heat")}))
+    await asyncio.sleep(0)
+
+    await manager.stop()
+    with pytest.raises(asyncio.CancelledError):
+        await send
+    mock_controller.set_mode.assert_not_awaited()
+
+
+async def test_rate_limiter_spaces_events():
+    """Test events are spaced by the interval, the first one is not delayed."""
+    limiter = RateLimiter(0.05)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await limiter.async_wait()
+    assert loop.time() - start < 0.04
+    await limiter.async_wait()
+    assert loop.time() - start >= 0.04
+
+
+async def test_commands_merge_while_rate_limited(hass, mock_controller, config_entry):
+    """Test setpoints issued while a device is rate limited collapse into the newest."""
+    config_entry.async_create_background_task.side_effect = lambda hass, coro, name: (
+        asyncio.get_running_loop().create_task(coro)
+    )
+    config_entry.options = {"device_command_interval": 50, "account_command_interval": 0}
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    mock_controller.set_temperature = AsyncMock()
+
+    with patch("custom_components.intesisaccloud.commands.COMMAND_BATCH_WINDOW", 0):
+        await manager.async_send_commands("1", {"setpoint": ("set_temperature", 20)})
+
+        # A slider drag while the device is still inside its interval
+        sends = [
+            asyncio.get_running_loop().create_task(
+                manager.async_send_commands("1", {"setpoint": ("set_temperature", 20 + step)})
+            )
+            for step in range(1, 6)
+        ]
+        await asyncio.gather(*sends)
+
+    assert [call.args for call in mock_controller.set_temperature.await_args_list] == [("1", 20), ("1", 25)]
+    assert manager.stats["commands_merged"] == 4
+    assert manager.stats["commands_sent"] == 2
+
+
+async def test_command_queue_is_bounded(manager, mock_controller):
+    """Test commands beyond the queue depth are rejected, even when they would be merged."""
+    mock_controller.set_zone_status = AsyncMock()
+
+    with patch("custom_components.intesisaccloud.commands.COMMAND_BATCH_WINDOW", 0.01):
+        queued = [
+            asyncio.get_running_loop().create_task(
+                manager.async_send_commands("1", {"zone_1": ("set_zone_status", 1, "on")})
+            )
+            for _ in range(MAX_QUEUED_COMMANDS)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(HomeAssistantError):
+            await manager.async_send_commands("1", {"zone_1": ("set_zone_status", 1, "off")})
+        await asyncio.gather(*queued)
+
+        # The queue empties once the batch is sent
+        await manager.async_send_commands("1", {"zone_1": ("set_zone_status", 1, "off")})
+
+    assert manager.stats["commands_dropped"] == 1
+    assert manager.stats["commands_merged"] == MAX_QUEUED_COMMANDS - 1
@@ -0,0 +1,36 @@
+import json
+from unittest.mock import AsyncMock
+
+from homeassistant.helpers.json import JSONEncoder
+
+from custom_components.intesisaccloud import DOMAIN
+from custom_components.intesisaccloud.diagnostics import async_get_config_entry_diagnostics
+from custom_components.intesisaccloud.manager import IntesisManager
+
+
+async def test_diagnostics(hass, mock_controller, config_entry):
+    """Test diagnostics redact credentials and report the manager's counters."""
+    config_entry.options = {"coalesce_window": 0}
+    mock_controller.get_devices.return_value = {"1": {"name": "AC 1"}, "2": {"name": "AC 2"}}
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    await manager.async_connect()
+    manager.async_subscribe("1", AsyncMock())
+    await manager.async_update_callback("1")
+    await manager.async_update_callback("1")
+    manager.command_latency.record(0.2)
+    hass.data[DOMAIN]["controller"] = {config_entry.entry_id: manager}
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+
+    assert diagnostics["entry"]["data"]["password"] == "**REDACTED**"
+    assert diagnostics["entry"]["data"]["username"] == "**REDACTED**"
+    assert diagnostics["connection"]["connected"] is True
+    assert diagnostics["listeners"]["count"] == 1
+    assert diagnostics["updates"]["callback_interval"]["count"] == 1
+    assert diagnostics["updates"]["dispatch_latency"]["count"] == 2
+    assert diagnostics["devices"]["1"]["last_update_age"] is not None
+    assert diagnostics["devices"]["2"]["last_update_age"] is None
+    assert diagnostics["commands"]["round_trip"]["percentiles_ms"]["p50"] == 200
+    # Diagnostics are downloaded as JSON
+    json.dumps(diagnostics, cls=JSONEncoder)
+    await manager.stop()
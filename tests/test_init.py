@@ -0,0 +1,112 @@
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.intesisaccloud import DOMAIN, async_setup, async_setup_entry, async_unload_entry
+from custom_components.intesisaccloud.capabilities import DeviceCapabilities
+
+
+@pytest.fixture(autouse=True)
+def snapshot_store():
+    """Patch the snapshot store, entries start without a snapshot unless a test adds one."""
+    with patch("custom_components.intesisaccloud.DeviceSnapshotStore") as mock_store:
+        mock_store.return_value.async_load = AsyncMock(return_value=None)
+        yield mock_store.return_value
+
+
+async def test_setup_adopts_flow_controller(hass, config_entry, mock_controller):
+    """Test setup reuses the controller the config flow already connected."""
+    mock_controller.get_devices.return_value = {"123": {"name": "Test AC"}}
+    hass.data[DOMAIN] = {
+        "flow_controllers": {config_entry.unique_id: {"controller": mock_controller, "created": time.monotonic()}}
+    }
+
+    with patch("pyintesishome.IntesisHome") as mock_intesishome:
+        assert await async_setup_entry(hass, config_entry)
+
+    mock_intesishome.assert_not_called()
+    mock_controller.connect.assert_not_awaited()
+    manager = hass.data[DOMAIN]["controller"][config_entry.entry_id]
+    assert manager.controller is mock_controller
+    assert manager.is_connected
+    assert not hass.data[DOMAIN]["flow_controllers"]
+
+
+async def test_setup_replaces_expired_flow_controller(hass, config_entry, mock_controller):
+    """Test an expired controller from the config flow is stopped and replaced."""
+    mock_controller.get_devices.return_value = {"123": {"name": "Test AC"}}
+    hass.data[DOMAIN] = {
+        "flow_controllers": {
+            config_entry.unique_id: {"controller": mock_controller, "created": time.monotonic() - 3600}
+        }
+    }
+    new_controller = MagicMock()
+    new_controller.connect = AsyncMock()
+
+    with (
+        patch("pyintesishome.IntesisHome", return_value=new_controller),
+        patch("homeassistant.helpers.aiohttp_client.async_get_clientsession"),
+    ):
+        assert await async_setup_entry(hass, config_entry)
+
+    mock_controller.stop.assert_awaited_once()
+    new_controller.connect.assert_awaited_once()
+    assert hass.data[DOMAIN]["controller"][config_entry.entry_id].controller is new_controller
+
+
+async def test_setup_shares_connect_limiter_and_records_timings(hass, config_entry, mock_controller):
+    """Test entries connect through the limiter from async_setup and report setup phases."""
+    assert await async_setup(hass, {DOMAIN: {"max_concurrent_connects": 2, "host_connect_interval": 0}})
+    limiter = hass.data[DOMAIN]["connect_limiter"]
+
+    with (
+        patch("pyintesishome.IntesisHome", return_value=mock_controller),
+        patch("homeassistant.helpers.aiohttp_client.async_get_clientsession"),
+    ):
+        assert await async_setup_entry(hass, config_entry)
+
+    manager = hass.data[DOMAIN]["controller"][config_entry.entry_id]
+    assert manager.connect_limiter is limiter
+    assert set(manager.startup_timings) == {"import", "connect_wait", "connect", "platform_forward"}
+
+
+async def test_setup_from_snapshot_connects_in_background(hass, config_entry, mock_controller, snapshot_store):
+    """Test an entry with a snapshot sets up its platforms without waiting for the API."""
+    devices = {}
+    mock_controller.get_devices.return_value = devices
+    snapshot_store.async_load.return_value = {
+        "devices": {"123": {"name": "Test AC", "power": "on"}},
+        "capabilities": {"123": {"modes": ["cool"], "zones": 0}},
+    }
+
+    with (
+        patch("pyintesishome.IntesisHome", return_value=mock_controller),
+        patch("homeassistant.helpers.aiohttp_client.async_get_clientsession"),
+        patch("custom_components.intesisaccloud.manager.async_track_time_interval"),
+    ):
+        assert await async_setup_entry(hass, config_entry)
+
+    mock_controller.connect.assert_not_awaited()
+    config_entry.async_create_background_task.assert_called_once()
+    config_entry.async_create_background_task.call_args.args[1].close()
+    hass.config_entries.async_forward_entry_setups.assert_awaited_once()
+    manager = hass.data[DOMAIN]["controller"][config_entry.entry_id]
+    assert manager.is_restored
+    assert devices == {"123": {"name": "Test AC", "power": "on"}}
+    assert manager.get_capabilities("123") == DeviceCapabilities(modes=("cool",))
+
+
+async def test_unload_entry_stops_its_controller(hass, config_entry, mock_controller):
+    """Test unloading an entry stops its controller and forgets the manager."""
+    with (
+        patch("pyintesishome.IntesisHome", return_value=mock_controller),
+        patch("homeassistant.helpers.aiohttp_client.async_get_clientsession"),
+        patch("custom_components.intesisaccloud.manager.async_track_time_interval"),
+    ):
+        assert await async_setup_entry(hass, config_entry)
+
+    hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+    assert await async_unload_entry(hass, config_entry)
+    mock_controller.stop.assert_awaited_once()
+    assert config_entry.entry_id not in hass.data[DOMAIN]["controller"]
@@ -1,6 +1,13 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
-from custom_components.intesisaccloud.manager import IntesisManager
+from pyintesishome import IHAuthenticationError, IHConnectionError
+
+from custom_components.intesisaccloud.capabilities import DeviceCapabilities
+from custom_components.intesisaccloud.manager import ConnectLimiter, IntesisManager
+from custom_components.intesisaccloud.snapshot import DeviceSnapshotStore
+
 
 @pytest.fixture
 def mock_controller():
@@ -11,6 +18,7 @@ def mock_controller():
     controller.is_connected = False
     return controller
 
+
 async def test_manager_initialization(hass, mock_controller, config_entry):
     """Test manager initialization."""
     manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
@@ -20,72 +28,547 @@ async def test_manager_initialization(hass, mock_controller, config_entry):
     assert manager.device_type == "IntesisHome"
     assert not manager.is_connected
 
+
 async def test_manager_connect(hass, mock_controller, config_entry):
     """Test async_connect."""
     manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
     await manager.async_connect()
-    
+
     mock_controller.connect.assert_awaited_once()
     assert manager.is_connected
     mock_controller.add_update_callback.assert_called_once_with(manager.async_update_callback)
 
+    # Connecting again must not subscribe to the controller a second time
+    await manager.async_connect()
+    mock_controller.add_update_callback.assert_called_once_with(manager.async_update_callback)
+
+
+async def test_manager_fallback_poll(hass, mock_controller, config_entry):
+    """Test the manager only polls listeners while the socket is down."""
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    mock_callback = AsyncMock()
+    manager.add_update_callback(mock_callback)
+
+    manager._connected = True
+    await manager._async_poll()
+    mock_callback.assert_not_awaited()
+    assert manager.stats["polls_skipped"] == 1
+
+    manager._connected = False
+    await manager._async_poll()
+    mock_callback.assert_awaited_once_with(None, None)
+    assert manager.stats["polls_performed"] == 1
+
+
+async def test_manager_idle_cloud_account_is_not_polled(hass, mock_controller, config_entry):
+    """Test a connected cloud account is not polled before a command opens its socket."""
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    mock_callback = AsyncMock()
+    manager.add_update_callback(mock_callback)
+    # The cloud controller logs in over HTTP and leaves the socket closed
+    mock_controller.is_connected = False
+
+    with patch("custom_components.intesisaccloud.manager.async_track_time_interval"):
+        await manager.async_connect()
+    await manager._async_poll()
+
+    mock_callback.assert_not_awaited()
+    assert manager.stats["polls_skipped"] == 1
+    assert manager.stats["polls_performed"] == 0
+
+
+async def test_manager_scan_interval_option(hass, mock_controller, config_entry):
+    """Test the fallback poll interval comes from the entry options."""
+    config_entry.options = {"scan_interval": 120}
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    assert manager.scan_interval.total_seconds() == 120
+
+
 async def test_manager_stop(hass, mock_controller, config_entry):
     """Test stop."""
     manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    await manager.async_connect()
     await manager.stop()
-    
-    # Check that remove_update_callback is called on the controller (manager delegates)
+
+    # Check that the manager's own subscription is removed from the controller
     mock_controller.remove_update_callback.assert_called_once_with(manager.async_update_callback)
     mock_controller.stop.assert_awaited_once()
 
+
 async def test_manager_callbacks(hass, mock_controller, config_entry):
     """Test add/remove update callbacks."""
     manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
     mock_callback = AsyncMock()
-    
+
     manager.add_update_callback(mock_callback)
-    assert mock_callback in manager._update_callbacks
-    
-    # Test callback propagation
-    await manager.async_update_callback("123")
-    mock_callback.assert_awaited_with("123")
-    
+    assert manager.listener_count == 1
+
+    # Test broadcast propagation once the coalescing window closes
+    await manager.async_update_callback()
+    mock_callback.assert_not_awaited()
+    await manager._async_dispatch_pending()
+    mock_callback.assert_awaited_with(None, None)
+
     manager.remove_update_callback(mock_callback)
-    assert mock_callback not in manager._update_callbacks
+    assert manager.listener_count == 0
+
+
+async def test_manager_device_subscriptions(hass, mock_controller, config_entry):
+    """Test device updates only reach that device's listeners."""
+    config_entry.options = {"coalesce_window": 0}
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    first, second, connection = AsyncMock(), AsyncMock(), AsyncMock()
+
+    unsub_first = manager.async_subscribe("123", first)
+    manager.async_subscribe("456", second)
+    manager.async_subscribe(None, connection)
+    assert manager.listener_count == 3
+
+    await manager.async_update_callback("123")
+    first.assert_awaited_once_with("123", None)
+    second.assert_not_awaited()
+    connection.assert_not_awaited()
+
+    # Broadcasts reach every channel
+    await manager.async_update_callback()
+    first.assert_awaited_with(None, None)
+    second.assert_awaited_once_with(None, None)
+    connection.assert_awaited_once_with(None, None)
+
+    unsub_first()
+    await manager.async_update_callback("123")
+    assert first.await_count == 2
+    assert manager.listener_count == 2
+
+
+async def test_manager_coalesces_updates(hass, mock_controller, config_entry):
+    """Test a burst of callbacks for one device results in a single dispatch."""
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    mock_callback = AsyncMock()
+    manager.async_subscribe("123", mock_callback)
+    manager.async_subscribe("456", mock_callback)
+
+    with patch("custom_components.intesisaccloud.manager.async_call_later") as mock_call_later:
+        for _ in range(5):
+            await manager.async_update_callback("123")
+        await manager.async_update_callback("456")
+
+    # Only one window is opened for the whole burst
+    mock_call_later.assert_called_once()
+    await manager._async_dispatch_pending()
+
+    assert mock_callback.await_count == 2
+    mock_callback.assert_any_await("123", None)
+    mock_callback.assert_any_await("456", None)
+    assert manager.stats["callbacks_received"] == 6
+    assert manager.stats["dispatches"] == 2
+
+
+async def test_manager_coalesce_broadcast(hass, mock_controller, config_entry):
+    """Test a broadcast update supersedes pending per-device updates."""
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    mock_callback = AsyncMock()
+    manager.add_update_callback(mock_callback)
+
+    with patch("custom_components.intesisaccloud.manager.async_call_later"):
+        await manager.async_update_callback("123")
+        await manager.async_update_callback()
+    await manager._async_dispatch_pending()
+
+    mock_callback.assert_awaited_once_with(None, None)
+
+
+async def test_manager_coalesce_disabled(hass, mock_controller, config_entry):
+    """Test a zero window dispatches immediately."""
+    config_entry.options = {"coalesce_window": 0}
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    mock_callback = AsyncMock()
+    manager.async_subscribe("123", mock_callback)
+
+    await manager.async_update_callback("123")
+    mock_callback.assert_awaited_once_with("123", None)
+
+
+async def test_manager_changed_keys(hass, mock_controller, config_entry):
+    """Test listeners are told which device keys changed since the last dispatch."""
+    config_entry.options = {"coalesce_window": 0}
+    device = {"power": "on", "setpoint": 220, "rssi": -60}
+    mock_controller.get_device.return_value = device
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    mock_callback = AsyncMock()
+    manager.async_subscribe("123", mock_callback)
+
+    # Nothing to compare against yet, so the listener refreshes everything
+    await manager.async_update_callback("123")
+    mock_callback.assert_awaited_with("123", None)
+
+    device["setpoint"] = 230
+    device["mode"] = "cool"
+    await manager.async_update_callback("123")
+    mock_callback.assert_awaited_with("123", frozenset({"setpoint", "mode"}))
+
+    await manager.async_update_callback("123")
+    mock_callback.assert_awaited_with("123", frozenset())
+
+
+async def test_manager_listener_isolation(hass, mock_controller, config_entry):
+    """Test a failing or slow listener does not affect the others."""
+    config_entry.options = {"coalesce_window": 0}
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+
+    async def slow_listener(device_id, changed_keys):
+        await asyncio.sleep(1)
+
+    failing = AsyncMock(side_effect=ValueError("boom"))
+    healthy = AsyncMock()
+    manager.async_subscribe("123", slow_listener)
+    manager.async_subscribe("123", failing)
+    manager.async_subscribe("123", healthy)
+
+    with patch("custom_components.intesisaccloud.manager.LISTENER_TIMEOUT", 0.01):
+        await manager.async_update_callback("123")
+
+    healthy.assert_awaited_once_with("123", None)
+    assert manager.stats["listener_errors"] == 1
+    assert manager.stats["listener_timeouts"] == 1
+    assert len(manager.listener_latency) == 3
+    assert all(histogram.count == 1 for histogram in manager.listener_latency.values())
+
 
 async def test_manager_reconnection_logic(hass, mock_controller, config_entry):
     """Test reconnection logic when connection is lost."""
+    from pyintesishome import IHConnectionError
+
+    config_entry.async_create_background_task.side_effect = lambda hass, coro, name: (
+        asyncio.get_running_loop().create_task(coro)
+    )
     manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
     manager._connected = True
-    mock_controller.is_connected = False # Simulate disconnection
-    
-    # Patch top-level imports in manager.py
-    with patch("custom_components.intesisaccloud.manager.async_call_later") as mock_call_later, \
-         patch("custom_components.intesisaccloud.manager.random.randrange", return_value=10):
-        
-        await manager.async_update_callback()
-        
+    mock_controller.is_connected = False  # Simulate disconnection
+    listener = AsyncMock()
+    manager.async_subscribe("123", listener)
+
+    async def connect():
+        if mock_controller.connect.await_count == 1:
+            raise IHConnectionError("Fail")
+        mock_controller.is_connected = True
+
+    mock_controller.connect.side_effect = connect
+
+    with (
+        patch("custom_components.intesisaccloud.manager.asyncio.sleep") as mock_sleep,
+        patch("custom_components.intesisaccloud.manager.async_call_later"),
+        patch("custom_components.intesisaccloud.manager.random.uniform", side_effect=lambda low, high: high),
+    ):
+        await manager.async_update_callback("123")
         assert not manager.is_connected
-        # Verify reconnection scheduled
-        mock_call_later.assert_called() 
-        
-        # Extract the scheduled retry function
-        args, _ = mock_call_later.call_args
-        delay = args[1]
-        retry_func = args[2]
-        
-        assert delay == 10 # randrange value
-        
-        # Now fail the first retry
-        from pyintesishome import IHConnectionError
-        mock_controller.connect.side_effect = IHConnectionError("Fail")
-
-        await retry_func
-        
-        # Should verify it scheduled another retry
-        mock_controller.connect.assert_awaited()
-        
-        # Cleanup: close the recursive coroutine to avoid RuntimeWarning
-        args2, _ = mock_call_later.call_args
-        coro = args2[2]
-        coro.close()
+
+        # Only one supervisor runs however often the outage is reported
+        manager._async_start_reconnect()
+        config_entry.async_create_background_task.assert_called_once()
+        task = manager._reconnect_task
+
+        # The drop is broadcast so every entity can mark itself unavailable
+        await manager._async_dispatch_pending()
+        listener.assert_any_await(None, None)
+
+        await task
+
+    # Exponential backoff from the cloud base delay, capped by the jitter range
+    assert [call.args[0] for call in mock_sleep.await_args_list] == [10, 20]
+    assert mock_controller.connect.await_count == 2
+    assert manager.is_connected
+    assert manager.stats["reconnect_attempts"] == 2
+    assert manager.stats["reconnect_failures"] == 1
+    assert manager.time_to_reconnect.count == 1
+    assert manager.outage_duration.count == 1
+    assert manager.reconnect_history[-1]["attempts"] == 2
+    assert manager.current_backoff is None
+    # Listeners are refreshed once reconnected
+    assert listener.await_count == 2
+
+
+async def test_manager_stop_cancels_reconnect(hass, mock_controller, config_entry):
+    """Test unloading cancels a running reconnect supervisor."""
+    config_entry.async_create_background_task.side_effect = lambda hass, coro, name: (
+        asyncio.get_running_loop().create_task(coro)
+    )
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    manager._connected = True
+
+    with patch("custom_components.intesisaccloud.manager.async_call_later"):
+        await manager.async_update_callback()
+    task = manager._reconnect_task
+    assert task is not None
+
+    await manager.stop()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    mock_controller.connect.assert_not_awaited()
+
+
+async def test_connect_limiter_bounds_concurrency():
+    """Test the limiter never lets more connections run than it allows."""
+    limiter = ConnectLimiter(2, 0)
+    running = peak = 0
+
+    async def connect(host):
+        nonlocal running, peak
+        async with limiter.async_slot(host):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(connect(f"host{index}") for index in range(6)))
+    assert peak == 2
+
+
+async def test_connect_limiter_spaces_logins_per_host():
+    """Test logins to one host are spaced while other hosts are not held back."""
+    limiter = ConnectLimiter(4, 0.05)
+    started = {}
+
+    async def connect(name, host):
+        async with limiter.async_slot(host):
+            started[name] = asyncio.get_running_loop().time()
+
+    await asyncio.gather(connect("first", "cloud"), connect("second", "cloud"), connect("local", "1.2.3.4"))
+    assert started["second"] - started["first"] >= 0.04
+    assert started["local"] - started["first"] < 0.04
+
+
+async def test_manager_connect_uses_limiter(hass, mock_controller, config_entry):
+    """Test connecting goes through the shared limiter and records its timings."""
+    limiter = ConnectLimiter(1, 0)
+    mock_controller.get_devices.return_value = {"123": {"power": "on"}}
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome", limiter)
+
+    with patch.object(limiter, "async_slot", wraps=limiter.async_slot) as mock_slot:
+        await manager.async_connect()
+
+    mock_slot.assert_called_once_with("1.2.3.4")
+    assert set(manager.startup_timings) == {"connect_wait", "connect"}
+    # The first frame after connecting is compared against the discovered state
+    mock_controller.get_device.return_value = {"power": "off"}
+    assert manager._diff_device("123") == frozenset({"power"})
+
+
+async def test_manager_device_snapshot(hass, mock_controller, config_entry):
+    """Test the snapshot follows device dispatches and broadcasts."""
+    config_entry.options = {"coalesce_window": 0}
+    device = {"rssi": -60}
+    mock_controller.get_devices.return_value = {"123": device}
+    mock_controller.is_connected = True
+    mock_controller.get_device.return_value = device
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    assert manager.get_device_snapshot("123") == {}
+
+    await manager.async_connect()
+    assert manager.get_device_snapshot("123") == {"rssi": -60}
+
+    device["rssi"] = -70
+    await manager.async_update_callback("123")
+    assert manager.get_device_snapshot("123") == {"rssi": -70}
+
+    device["rssi"] = -80
+    await manager._async_dispatch()
+    assert manager.get_device_snapshot("123") == {"rssi": -80}
+    await manager.stop()
+
+
+@pytest.fixture
+def snapshot_store():
+    store = MagicMock()
+    store.async_load = AsyncMock(
+        return_value={
+            "devices": {"123": {"power": "on", "config_fan_map": {1: "quiet"}}},
+            "capabilities": {"123": {"modes": ["cool"], "zones": 0}},
+        }
+    )
+    return store
+
+
+async def test_manager_restore_seeds_devices(hass, mock_controller, config_entry, snapshot_store):
+    """Test the snapshot seeds the controller's devices and the capabilities."""
+    devices = {}
+    mock_controller.get_devices.return_value = devices
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome", snapshot_store=snapshot_store)
+
+    with patch("custom_components.intesisaccloud.manager.async_track_time_interval"):
+        assert await manager.async_restore()
+
+    assert manager.is_restored
+    assert not manager.is_connected
+    assert devices == {"123": {"power": "on", "config_fan_map": {1: "quiet"}}}
+    assert manager.get_device_snapshot("123") == devices["123"]
+    assert manager.get_capabilities("123") == DeviceCapabilities(modes=("cool",))
+    assert "restore" in manager.startup_timings
+    mock_controller.add_update_callback.assert_called_once_with(manager.async_update_callback)
+    await manager.stop()
+
+
+async def test_manager_restore_without_snapshot(hass, mock_controller, config_entry, snapshot_store):
+    """Test there is nothing to restore without a store or a snapshot."""
+    assert not await IntesisManager(hass, mock_controller, config_entry, "IntesisHome").async_restore()
+
+    snapshot_store.async_load.return_value = None
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome", snapshot_store=snapshot_store)
+    assert not await manager.async_restore()
+    assert not manager.is_restored
+
+
+async def test_manager_background_connect_failure(hass, mock_controller, config_entry, snapshot_store):
+    """Test a failed background connect keeps the snapshot and hands over to the supervisor."""
+    mock_controller.connect.side_effect = IHConnectionError
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome", snapshot_store=snapshot_store)
+
+    with patch("custom_components.intesisaccloud.manager.async_track_time_interval"):
+        await manager.async_restore()
+        with patch.object(manager, "_async_start_reconnect") as mock_reconnect:
+            await manager.async_connect_in_background()
+
+    mock_reconnect.assert_called_once()
+    assert manager.is_restored
+    snapshot_store.async_delay_save.assert_not_called()
+
+
+async def test_manager_background_connect_rejected(hass, mock_controller, config_entry, snapshot_store):
+    """Test rejected credentials start reauth and stop showing the snapshot."""
+    mock_controller.connect.side_effect = IHAuthenticationError
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome", snapshot_store=snapshot_store)
+    listener = AsyncMock()
+    manager.async_subscribe(None, listener)
+
+    with patch("custom_components.intesisaccloud.manager.async_track_time_interval"):
+        await manager.async_restore()
+        with patch.object(manager, "_async_start_reconnect") as mock_reconnect:
+            await manager.async_connect_in_background()
+
+    config_entry.async_start_reauth.assert_called_once_with(hass)
+    mock_reconnect.assert_not_called()
+    assert not manager.is_restored
+    assert not manager.is_connected
+    # Entities are told so they show themselves unavailable
+    listener.assert_awaited_once_with(None, None)
+
+
+async def test_manager_background_connect_saves_snapshot(hass, mock_controller, config_entry, snapshot_store):
+    """Test connecting replaces the restored state and writes a new snapshot."""
+    devices = {}
+    mock_controller.get_devices.return_value = devices
+    mock_controller.get_device.side_effect = devices.get
+    mock_controller.get_mode_list.return_value = ["cool", "heat"]
+    mock_controller.is_connected = True
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome", snapshot_store=snapshot_store)
+
+    with patch("custom_components.intesisaccloud.manager.async_track_time_interval"):
+        await manager.async_restore()
+        mock_controller.connect.side_effect = lambda: devices.update({"123": {"power": "off"}})
+        await manager.async_connect_in_background()
+
+    assert manager.is_connected
+    assert not manager.is_restored
+    assert manager.get_capabilities("123").modes == ("cool", "heat")
+    hass.config_entries.async_schedule_reload.assert_not_called()
+    data_func = snapshot_store.async_delay_save.call_args.args[0]
+    assert data_func()["devices"]["123"]["power"] == "off"
+    assert DeviceCapabilities.from_dict(data_func()["capabilities"]["123"]) == manager.get_capabilities("123")
+    await manager.stop()
+
+
+async def test_manager_reloads_when_devices_changed(hass, mock_controller, config_entry, snapshot_store):
+    """Test the entry reloads when the account's devices differ from the snapshot."""
+    devices = {}
+    mock_controller.get_devices.return_value = devices
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome", snapshot_store=snapshot_store)
+
+    with patch("custom_components.intesisaccloud.manager.async_track_time_interval"):
+        await manager.async_restore()
+        devices["456"] = {"power": "on"}
+        await manager.async_connect()
+
+    hass.config_entries.async_schedule_reload.assert_called_once_with(config_entry.entry_id)
+    await manager.stop()
+
+
+async def test_manager_drops_restored_devices_the_account_lost(hass, mock_controller, config_entry, snapshot_store):
+    """Test devices only the snapshot knows are gone after connecting, and from the next snapshot."""
+    devices = {}
+    mock_controller.get_devices.return_value = devices
+    mock_controller.get_device.side_effect = devices.get
+    mock_controller.is_connected = True
+    snapshot_store.async_load.return_value["devices"]["456"] = {"power": "off"}
+    snapshot_store.async_load.return_value["capabilities"]["456"] = {"zones": 0}
+
+    async def connect():
+        # The live account only reports device 123
+        assert "456" not in devices
+        devices["123"] = {"power": "on"}
+
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome", snapshot_store=snapshot_store)
+    with patch("custom_components.intesisaccloud.manager.async_track_time_interval"):
+        await manager.async_restore()
+        assert set(devices) == {"123", "456"}
+
+        # A failed attempt keeps showing the snapshot
+        mock_controller.connect.side_effect = IHConnectionError
+        with patch.object(manager, "_async_start_reconnect"):
+            await manager.async_connect_in_background()
+        assert set(devices) == {"123", "456"}
+
+        mock_controller.connect.side_effect = connect
+        await manager.async_connect_in_background()
+
+    assert set(devices) == {"123"}
+    hass.config_entries.async_schedule_reload.assert_called_once_with(config_entry.entry_id)
+    data_func = snapshot_store.async_delay_save.call_args.args[0]
+    assert set(data_func()["devices"]) == set(data_func()["capabilities"]) == {"123"}
+    await manager.stop()
+
+
+async def test_snapshot_store_restores_integer_keys(hass):
+    """Test keys JSON turned into strings are integers again after loading."""
+    store = DeviceSnapshotStore(hass, "test_entry_id")
+    stored = {
+        "devices": {"123": {"config_fan_map": {"1": "quiet", "2": "low"}, "name": "AC"}},
+        "capabilities": {"123": {"zones": 0}},
+    }
+    with patch.object(store._store, "async_load", AsyncMock(return_value=stored)):
+        snapshot = await store.async_load()
+    assert snapshot["devices"] == {"123": {"config_fan_map": {1: "quiet", 2: "low"}, "name": "AC"}}
+
+    with patch.object(store._store, "async_load", AsyncMock(return_value={"devices": {}})):
+        assert await store.async_load() is None
+
+
+async def test_manager_rebuilds_capabilities_on_model_change(hass, mock_controller, config_entry):
+    """Test the capability profile is kept across updates until the model or zones change."""
+    config_entry.options = {"coalesce_window": 0}
+    device = {"model": "MH-AC-WIFI-1", "number_of_zones": 0, "setpoint": 220}
+    mock_controller.get_devices.return_value = {"123": device}
+    mock_controller.get_device.return_value = device
+    mock_controller.get_mode_list.return_value = ["cool"]
+    mock_controller.is_connected = True
+    manager = IntesisManager(hass, mock_controller, config_entry, "IntesisHome")
+    await manager.async_connect()
+    capabilities = manager.get_capabilities("123")
+    assert capabilities == DeviceCapabilities(
+        model="MH-AC-WIFI-1", setpoint_control=True, vertical_swing=True, horizontal_swing=True, modes=("cool",)
+    )
+    # Profiles are hashable, so what platforms derive from them can be cached
+    assert hash(capabilities) == hash(manager.get_capabilities("123"))
+
+    mock_controller.get_mode_list.reset_mock()
+    device["setpoint"] = 230
+    await manager.async_update_callback("123")
+    await manager._async_dispatch()
+    assert manager.get_capabilities("123") is capabilities
+    mock_controller.get_mode_list.assert_not_called()
+
+    device["model"] = "MH-AC-WIFI-2"
+    mock_controller.get_mode_list.return_value = ["cool", "heat"]
+    await manager.async_update_callback("123")
+    assert manager.get_capabilities("123").model == "MH-AC-WIFI-2"
+    assert manager.get_capabilities("123").modes == ("cool", "heat")
+    await manager.stop()
@@ -0,0 +1,33 @@
+from custom_components.intesisaccloud.metrics import LatencyHistogram
+
+
+def test_latency_histogram():
+    """Test durations are bucketed and summarised."""
+    histogram = LatencyHistogram()
+    assert histogram.as_dict()["mean_ms"] is None
+
+    histogram.record(0.0005)
+    histogram.record(0.02)
+    histogram.record(10)
+
+    result = histogram.as_dict()
+    assert result["count"] == 3
+    assert result["max_ms"] == 10000
+    assert result["buckets"]["<=1ms"] == 1
+    assert result["buckets"]["<=25ms"] == 1
+    assert result["buckets"][">5000ms"] == 1
+
+
+def test_latency_histogram_percentiles():
+    """Test percentiles are estimated from the bucket bounds."""
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+
+    for _ in range(8):
+        histogram.record(0.003)
+    histogram.record(0.04)
+    histogram.record(10)
+
+    assert histogram.percentile(50) == 5
+    assert histogram.percentile(90) == 50
+    assert histogram.percentile(99) == 10000
@@ -0,0 +1,113 @@
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+from custom_components.intesisaccloud import DOMAIN
+from custom_components.intesisaccloud.sensor import (
+    ENERGY_SENSOR_DESCRIPTIONS,
+    IntesisEnergySensor,
+    async_setup_entry,
+)
+
+
+def _mock_manager(mock_controller, snapshot):
+    manager = MagicMock()
+    manager.controller = mock_controller
+    manager.device_type = "IntesisHome"
+    manager.is_connected = True
+    manager.stats = Counter()
+    manager.get_devices.return_value = {"12345": {"name": "Test AC", **snapshot}}
+    manager.get_device_snapshot.return_value = snapshot
+    manager.device_last_update = {}
+    manager.command_round_trip = {"12345": 0.25}
+    return manager
+
+
+async def test_sensor_setup(hass, mock_controller):
+    """Test sensors are created for the keys a device reports."""
+    manager = _mock_manager(
+        mock_controller, {"rssi": -60, "working_hours": 1200, "outdoor_temp": 65526, "aquarea_cool_consumption": "1500"}
+    )
+    mock_controller.get_outdoor_temperature.return_value = -1.0
+    hass.data[DOMAIN] = {"controller": {"test_entry": manager}}
+    async_add_entities = MagicMock()
+    config_entry = MagicMock()
+    config_entry.entry_id = "test_entry"
+
+    await async_setup_entry(hass, config_entry, async_add_entities)
+
+    sensors = {entity.unique_id: entity for entity in async_add_entities.call_args.args[0]}
+    assert set(sensors) == {
+        "12345_rssi",
+        "12345_run_hours",
+        "12345_outdoor_temperature",
+        "12345_power_consumption_cool",
+        "12345_energy_cool",
+        "12345_last_update",
+        "12345_command_round_trip",
+    }
+    assert sensors["12345_rssi"].native_value == -60
+    assert sensors["12345_rssi"].name == "Test AC RSSI"
+    assert sensors["12345_outdoor_temperature"].native_value == -1.0
+    mock_controller.get_outdoor_temperature.assert_called_with("12345")
+    assert sensors["12345_power_consumption_cool"].native_value == 1500
+    assert sensors["12345_command_round_trip"].native_value == 250
+    # Raw values come from the manager's snapshot, the controller is only asked for conversions
+    mock_controller.get_rssi.assert_not_called()
+    # Sensors are pushed by the manager, Home Assistant does not poll them
+    assert not any(sensor.should_poll for sensor in sensors.values())
+
+
+async def test_sensor_updates_from_snapshot(hass, mock_controller):
+    """Test a sensor only refreshes when one of its keys changed."""
+    snapshot = {"rssi": -60}
+    manager = _mock_manager(mock_controller, snapshot)
+    hass.data[DOMAIN] = {"controller": {"test_entry": manager}}
+    async_add_entities = MagicMock()
+    config_entry = MagicMock()
+    config_entry.entry_id = "test_entry"
+    await async_setup_entry(hass, config_entry, async_add_entities)
+    rssi = async_add_entities.call_args.args[0][0]
+
+    with patch("homeassistant.helpers.entity.Entity.async_write_ha_state") as mock_write:
+        snapshot["rssi"] = -80
+        await rssi.async_update_callback("12345", frozenset({"setpoint"}))
+        assert rssi.native_value == -60
+        mock_write.assert_not_called()
+
+        await rssi.async_update_callback("12345", frozenset({"rssi"}))
+        assert rssi.native_value == -80
+        mock_write.assert_called_once()
+
+
+async def test_energy_sensor_integrates_power(hass, mock_controller):
+    """Test energy accumulates the power held between updates and survives restarts."""
+    snapshot = {"aquarea_heat_consumption": "2000"}
+    manager = _mock_manager(mock_controller, snapshot)
+    last_data = MagicMock(native_value=1.5)
+
+    with patch("custom_components.intesisaccloud.sensor.time.monotonic", return_value=0):
+        energy = IntesisEnergySensor(manager, "12345", "Test AC", ENERGY_SENSOR_DESCRIPTIONS[0])
+    energy.async_write_ha_state = MagicMock()
+    with patch.object(IntesisEnergySensor, "async_get_last_sensor_data", return_value=last_data):
+        await energy.async_added_to_hass()
+    assert energy.native_value == 1.5
+
+    # 2 kW for half an hour, then nothing for an hour
+    snapshot["aquarea_heat_consumption"] = "0"
+    with patch("custom_components.intesisaccloud.sensor.time.monotonic", return_value=1800):
+        await energy.async_update_callback("12345", frozenset({"aquarea_heat_consumption"}))
+    assert energy.native_value == 2.5
+    with patch("custom_components.intesisaccloud.sensor.time.monotonic", return_value=5400):
+        await energy.async_update_callback("12345", frozenset({"rssi"}))
+    assert energy.native_value == 2.5
+
+    # Nothing is counted while the connection is down
+    snapshot["aquarea_heat_consumption"] = "1000"
+    with patch("custom_components.intesisaccloud.sensor.time.monotonic", return_value=5400):
+        await energy.async_update_callback("12345", frozenset({"aquarea_heat_consumption"}))
+    manager.is_connected = False
+    with patch("custom_components.intesisaccloud.sensor.time.monotonic", return_value=9000):
+        await energy.async_update_callback("12345", None)
+    with patch("custom_components.intesisaccloud.sensor.time.monotonic", return_value=12600):
+        await energy.async_update_callback("12345", None)
+    assert energy.native_value == 3.5
@@ -0,0 +1,70 @@
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.intesisaccloud import DOMAIN
+from custom_components.intesisaccloud.capabilities import DeviceCapabilities
+from custom_components.intesisaccloud.services import SET_ZONES_SCHEMA, async_setup_services
+
+
+@pytest.fixture
+def zone_manager(hass):
+    """Return a manager with one three zone device."""
+    device = {"name": "Test AC", "zone_status_1": 1, "zone_status_2": 0, "zone_status_3": 0}
+    manager = MagicMock()
+    manager.get_devices.return_value = {"12345": device}
+    manager.get_capabilities.return_value = DeviceCapabilities(zones=3)
+    manager.async_send_commands = AsyncMock()
+    manager.stats = Counter()
+    manager.zone_switches = {}
+    hass.data[DOMAIN] = {"controller": {"entry": manager}}
+    return manager
+
+
+@pytest.fixture
+def set_zones(hass):
+    """Return the registered set_zones handler."""
+    async_setup_services(hass, DOMAIN)
+    handler = hass.services.async_register.call_args.args[2]
+
+    async def call(data):
+        await handler(MagicMock(data=SET_ZONES_SCHEMA(data)))
+
+    return call
+
+
+async def test_set_zones_sends_one_batch(zone_manager, set_zones):
+    """Test zones are switched in one batch and matching zones are skipped."""
+    manager = zone_manager
+    switch = MagicMock()
+    manager.zone_switches = {("12345", 2): switch}
+
+    await set_zones({"device": "12345", "zones": {"1": "on", "2": "on", "3": False}})
+
+    manager.async_send_commands.assert_awaited_once_with("12345", {"zone_2": ("set_zone_status", 2, "on")})
+    switch.async_set_requested_state.assert_called_once_with(True)
+    assert manager.stats["zone_commands_skipped"] == 2
+
+
+async def test_set_zones_unknown_device(hass, set_zones):
+    """Test an unknown device is rejected."""
+    hass.data[DOMAIN] = {"controller": {}}
+    with pytest.raises(ServiceValidationError, match="Unknown IntesisACCloud device: missing"):
+        await set_zones({"device": "missing", "zones": {"1": True}})
+
+
+async def test_set_zones_unknown_zone(zone_manager, set_zones):
+    """Test a zone the device does not have is rejected before sending anything."""
+    with pytest.raises(ServiceValidationError, match="Zone 4 does not exist"):
+        await set_zones({"device": "12345", "zones": {"1": False, "4": True}})
+    zone_manager.async_send_commands.assert_not_awaited()
+
+
+async def test_set_zones_spill_zone(zone_manager, set_zones):
+    """Test a spill zone is rejected as the unit switches it itself."""
+    zone_manager.get_devices.return_value["12345"]["zone_status_2"] = 7
+    with pytest.raises(ServiceValidationError, match="spill zone"):
+        await set_zones({"device": "12345", "zones": {"2": False}})
+    zone_manager.async_send_commands.assert_not_awaited()
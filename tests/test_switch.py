@@ -1,6 +1,8 @@
-from unittest.mock import MagicMock
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from custom_components.intesisaccloud import DOMAIN
+from custom_components.intesisaccloud.capabilities import DeviceCapabilities
 from custom_components.intesisaccloud.switch import IntesisZoneSwitch, async_setup_entry
 
 
@@ -10,9 +12,9 @@ async def test_switch_setup_discovery(hass, mock_controller):
     device_info = {
         "name": "Test AC",
         "number_of_zones": 3,
-        "zone_status_1": 1,      # On
-        "zone_status_2": 0,      # Off
-        "zone_status_3": 7,      # Spill (should be skipped)
+        "zone_status_1": 1,  # On
+        "zone_status_2": 0,  # Off
+        "zone_status_3": 7,  # Spill (should be skipped)
     }
 
     mock_controller.get_devices.return_value = {device_id: device_info}
@@ -21,12 +23,13 @@ async def test_switch_setup_discovery(hass, mock_controller):
     mock_manager = MagicMock()
     mock_manager.controller = mock_controller
     mock_manager.get_devices.return_value = {device_id: device_info}
+    mock_manager.get_capabilities.return_value = DeviceCapabilities(zones=3)
     # Manager is passed in via hass.data
     hass.data[DOMAIN] = {"controller": {"test_entry": mock_manager}}
 
     async_add_entities = MagicMock()
     config_entry = MagicMock()
-    config_entry.unique_id = "test_entry"
+    config_entry.entry_id = "test_entry"
 
     await async_setup_entry(hass, config_entry, async_add_entities)
 
@@ -41,6 +44,7 @@ async def test_switch_setup_discovery(hass, mock_controller):
     assert entities[0].name == "Test AC Zone 1"
     assert entities[1].name == "Test AC Zone 2"
 
+
 async def test_switch_operations(hass, mock_controller):
     """Test turn on/off operations."""
     device_id = "12345"
@@ -51,6 +55,7 @@ async def test_switch_operations(hass, mock_controller):
 
     mock_manager = MagicMock()
     mock_manager.controller = mock_controller
+    mock_manager.async_send_commands = AsyncMock()
 
     entity = IntesisZoneSwitch(mock_manager, device_id, zone_index, 1)
     entity.hass = hass
@@ -58,38 +63,138 @@ async def test_switch_operations(hass, mock_controller):
 
     # Test Turn On
     await entity.async_turn_on()
-    mock_controller.set_zone_status.assert_called_with(device_id, zone_index, 'on')
+    mock_manager.async_send_commands.assert_awaited_with(device_id, {"zone_1": ("set_zone_status", zone_index, "on")})
 
     # Test Turn Off
     await entity.async_turn_off()
-    mock_controller.set_zone_status.assert_called_with(device_id, zone_index, 'off')
+    mock_manager.async_send_commands.assert_awaited_with(device_id, {"zone_1": ("set_zone_status", zone_index, "off")})
+
 
 async def test_switch_state(hass, mock_controller):
     """Test switch state reporting."""
     device_id = "12345"
     zone_index = 1
+    device = {"name": "Test AC"}
+    mock_controller.get_devices.return_value = {device_id: device}
 
-    # Mock devices for __init__
-    mock_controller.get_devices.return_value = {device_id: {"name": "Test AC"}}
-    
     mock_manager = MagicMock()
     mock_manager.controller = mock_controller
 
     entity = IntesisZoneSwitch(mock_manager, device_id, zone_index, 1)
-
-    # Test On (1)
-    mock_controller.get_devices.return_value = {device_id: {"zone_status_1": 1}}
+    entity.async_write_ha_state = MagicMock()
+    # Zones are pushed by the manager, Home Assistant does not poll them
+    assert entity.should_poll is False
+
+    # Controllers build new device dictionaries on every poll and reconnect
+    for status, expected in ((1, True), (0, False), ("on", True), ("off", False)):
+        mock_controller.get_devices.return_value = {device_id: {**device, "zone_status_1": status}}
+        await entity.async_update_callback(device_id, frozenset({"zone_status_1"}))
+        assert entity.is_on is expected
+
+    # Updates to other keys do not look the device up
+    mock_controller.get_devices.reset_mock()
+    await entity.async_update_callback(device_id, frozenset({"setpoint"}))
+    mock_controller.get_devices.assert_not_called()
+
+    mock_controller.get_devices.return_value = {device_id: {"number_of_zones": 2, "zone_status_1": 1}}
+    await entity.async_update_callback(device_id, frozenset({"number_of_zones"}))
     assert entity.is_on is True
 
 
-    # Test Off (0)
-    mock_controller.get_devices.return_value = {device_id: {"zone_status_1": 0}}
-    assert entity.is_on is False
+async def test_switch_suppresses_unchanged_writes(hass, mock_controller):
+    """Test parent device updates only write state when the zone changes."""
+    device_id = "12345"
+    device = {"name": "Test AC", "zone_status_1": 1}
+    mock_controller.get_devices.return_value = {device_id: device}
+
+    mock_manager = MagicMock()
+    mock_manager.controller = mock_controller
+    mock_manager.stats = Counter()
+
+    entity = IntesisZoneSwitch(mock_manager, device_id, 1, 1)
+
+    with patch("homeassistant.helpers.entity.Entity.async_write_ha_state") as mock_write:
+        await entity.async_update_callback()
+        # Updates to other keys of the device are not looked at
+        await entity.async_update_callback(device_id, frozenset({"setpoint"}))
+        # A broadcast that changes nothing is suppressed
+        await entity.async_update_callback()
+        assert mock_write.call_count == 1
+
+        device["zone_status_1"] = 0
+        await entity.async_update_callback(device_id, frozenset({"zone_status_1"}))
+        assert mock_write.call_count == 2
+
+    assert mock_manager.stats["state_writes"] == 2
+    assert mock_manager.stats["state_writes_suppressed"] == 1
 
-    # Test Spill (7) - even if we don't create it, checking logic just in case
-    mock_controller.get_devices.return_value = {device_id: {"zone_status_1": 7}}
+
+async def test_switch_optimistic_state(hass, mock_controller):
+    """Test a switched zone stays on until the device reports it."""
+    device_id = "12345"
+    device = {"name": "Test AC", "zone_status_1": 0}
+    mock_controller.get_devices.return_value = {device_id: device}
+
+    mock_manager = MagicMock()
+    mock_manager.controller = mock_controller
+    mock_manager.async_send_commands = AsyncMock()
+    mock_manager.stats = Counter()
+    mock_manager.confirm_latency = {}
+
+    entity = IntesisZoneSwitch(mock_manager, device_id, 1, 1)
+    entity.hass = hass
+    entity.async_write_ha_state = MagicMock()
+
+    with patch("custom_components.intesisaccloud.entity.async_call_later") as mock_call_later:
+        await entity.async_turn_on()
     assert entity.is_on is True
 
-    # Test 'on' string
-    mock_controller.get_devices.return_value = {device_id: {"zone_status_1": "on"}}
+    await entity.async_update_callback(device_id, frozenset({"setpoint"}))
     assert entity.is_on is True
+
+    device["zone_status_1"] = 1
+    await entity.async_update_callback(device_id, frozenset({"zone_status_1"}))
+    mock_call_later.return_value.assert_called_once()
+    assert mock_manager.confirm_latency["zone"].count == 1
+
+
+async def test_switch_zones_follow_the_device(hass, mock_controller):
+    """Test zones are added and removed as the device reports them."""
+    device_id = "12345"
+    device = {"name": "Test AC", "number_of_zones": 2, "zone_status_1": 1, "zone_status_2": 7}
+    mock_controller.get_devices.return_value = {device_id: device}
+
+    mock_manager = MagicMock()
+    mock_manager.controller = mock_controller
+    mock_manager.get_devices.return_value = {device_id: device}
+    # The manager rebuilds the profile when the zone count changes
+    mock_manager.get_capabilities.side_effect = lambda device_id: DeviceCapabilities(zones=device["number_of_zones"])
+    hass.data[DOMAIN] = {"controller": {"test_entry": mock_manager}}
+    async_add_entities = MagicMock()
+    config_entry = MagicMock()
+    config_entry.entry_id = "test_entry"
+
+    await async_setup_entry(hass, config_entry, async_add_entities)
+    assert [entity.unique_id for entity in async_add_entities.call_args.args[0]] == ["12345_zone_1"]
+    # The discovery listens to its device and to broadcasts
+    assert [call.args[0] for call in mock_manager.async_subscribe.call_args_list] == [device_id, None]
+    discovery = mock_manager.async_subscribe.call_args.args[1].__self__
+
+    # Other keys do not trigger a rescan
+    async_add_entities.reset_mock()
+    await discovery.async_update_callback(device_id, frozenset({"setpoint"}))
+    async_add_entities.assert_not_called()
+
+    # The spill zone becomes switchable and a third zone is installed
+    device.update({"number_of_zones": 3, "zone_status_2": 0, "zone_status_3": 1})
+    await discovery.async_update_callback(device_id, frozenset({"number_of_zones", "zone_status_2"}))
+    added = async_add_entities.call_args.args[0]
+    assert [entity.unique_id for entity in added] == ["12345_zone_2", "12345_zone_3"]
+    assert added[0].name == "Test AC Zone 2"
+
+    # Zone 2 spills again and zone 3 is taken out
+    device.update({"number_of_zones": 2, "zone_status_2": "spill"})
+    with patch.object(IntesisZoneSwitch, "async_remove", AsyncMock()) as mock_remove:
+        await discovery.async_update_callback(device_id, frozenset({"number_of_zones", "zone_status_2"}))
+    assert mock_remove.await_count == 2
+    assert set(discovery.switches[device_id]) == {1}